@@ -2,11 +2,14 @@
 import sys
 import os
 
-# Add parent directory to path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Add parent directory to path (once, even if the module is re-imported)
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
 
-from src.utils.text_chunker import TextChunker
-from src.utils.logger import setup_logger
+# Banner rules shared by every section
+BAR = "=" * 80
+SUB = "-" * 80
 
 # Sample long sales transcript
 SAMPLE_TRANSCRIPT = """
@@ -82,56 +85,61 @@ access by end of day and see you next Tuesday.
 
 def main():
     """Demonstrate chunking functionality."""
+    # Imported here so importing this module does not load LangChain/tiktoken
+    from src.utils.text_chunker import TextChunker
+    from src.utils.logger import setup_logger
+
     logger = setup_logger(__name__)
     
-    print("\n" + "=" * 80)
-    print("TEXT CHUNKING DEMONSTRATION WITH LANGCHAIN")
-    print("=" * 80)
+    print("\n" + BAR, "TEXT CHUNKING DEMONSTRATION WITH LANGCHAIN", BAR, sep="\n")
     
     # Initialize chunker
     chunker = TextChunker()
     
-    print(f"\n📄 Original Text Length: {len(SAMPLE_TRANSCRIPT)} characters")
-    print(f"📄 Original Text Preview (first 200 chars):")
-    print(f"   {SAMPLE_TRANSCRIPT[:200]}...\n")
+    print(
+        f"\n📄 Original Text Length: {len(SAMPLE_TRANSCRIPT)} characters",
+        f"📄 Original Text Preview (first 200 chars):",
+        f"   {SAMPLE_TRANSCRIPT[:200]}...\n",
+        sep="\n"
+    )
     
     # Method 1: Recursive Character Splitter
-    print("\n" + "-" * 80)
-    print("METHOD 1: Recursive Character Text Splitter (Recommended)")
-    print("-" * 80)
+    print("\n" + SUB, "METHOD 1: Recursive Character Text Splitter (Recommended)", SUB, sep="\n")
     
     recursive_chunks = chunker.chunk_text_recursive(SAMPLE_TRANSCRIPT)
     recursive_stats = chunker.get_chunk_stats(recursive_chunks)
     
-    print(f"\n✓ Total Chunks: {recursive_stats['total_chunks']}")
-    print(f"✓ Total Characters: {recursive_stats['total_characters']}")
-    print(f"✓ Average Chunk Size: {recursive_stats['avg_chunk_size']} chars")
-    print(f"✓ Min Chunk Size: {recursive_stats['min_chunk_size']} chars")
-    print(f"✓ Max Chunk Size: {recursive_stats['max_chunk_size']} chars")
-    
-    print(f"\n📝 First Chunk (length: {len(recursive_chunks[0])}):")
-    print(f"   {recursive_chunks[0][:300]}...")
+    lines = [
+        f"\n✓ Total Chunks: {recursive_stats['total_chunks']}",
+        f"✓ Total Characters: {recursive_stats['total_characters']}",
+        f"✓ Average Chunk Size: {recursive_stats['avg_chunk_size']} chars",
+        f"✓ Min Chunk Size: {recursive_stats['min_chunk_size']} chars",
+        f"✓ Max Chunk Size: {recursive_stats['max_chunk_size']} chars",
+        f"\n📝 First Chunk (length: {len(recursive_chunks[0])}):",
+        f"   {recursive_chunks[0][:300]}..."
+    ]
     
     if len(recursive_chunks) > 1:
-        print(f"\n📝 Second Chunk (length: {len(recursive_chunks[1])}):")
-        print(f"   {recursive_chunks[1][:300]}...")
+        lines.append(f"\n📝 Second Chunk (length: {len(recursive_chunks[1])}):")
+        lines.append(f"   {recursive_chunks[1][:300]}...")
+    
+    print(*lines, sep="\n")
     
     # Method 2: Token-based Splitter
-    print("\n\n" + "-" * 80)
-    print("METHOD 2: Token-based Text Splitter")
-    print("-" * 80)
+    print("\n\n" + SUB, "METHOD 2: Token-based Text Splitter", SUB, sep="\n")
     
     token_chunks = chunker.chunk_text_by_tokens(SAMPLE_TRANSCRIPT)
     token_stats = chunker.get_chunk_stats(token_chunks)
     
-    print(f"\n✓ Total Chunks: {token_stats['total_chunks']}")
-    print(f"✓ Average Chunk Size: {token_stats['avg_chunk_size']} chars")
-    print(f"✓ Min/Max Size: {token_stats['min_chunk_size']}/{token_stats['max_chunk_size']} chars")
+    print(
+        f"\n✓ Total Chunks: {token_stats['total_chunks']}",
+        f"✓ Average Chunk Size: {token_stats['avg_chunk_size']} chars",
+        f"✓ Min/Max Size: {token_stats['min_chunk_size']}/{token_stats['max_chunk_size']} chars",
+        sep="\n"
+    )
     
     # Method 3: Document Chunks with Metadata
-    print("\n\n" + "-" * 80)
-    print("METHOD 3: Document Chunks with Metadata")
-    print("-" * 80)
+    print("\n\n" + SUB, "METHOD 3: Document Chunks with Metadata", SUB, sep="\n")
     
     doc_chunks = chunker.chunk_documents(
         SAMPLE_TRANSCRIPT,
@@ -142,21 +150,23 @@ def main():
         }
     )
     
-    print(f"\n✓ Total Document Chunks: {len(doc_chunks)}")
+    lines = [f"\n✓ Total Document Chunks: {len(doc_chunks)}"]
     
     if doc_chunks:
-        print(f"\n📋 First Document Chunk Info:")
-        print(f"   Chunk Index: {doc_chunks[0]['chunk_index']}")
-        print(f"   Total Chunks: {doc_chunks[0]['total_chunks']}")
-        print(f"   Chunk Size: {doc_chunks[0]['chunk_size']} chars")
-        print(f"   Metadata: {doc_chunks[0].get('metadata', {})}")
-        print(f"   Text Preview: {doc_chunks[0]['text'][:200]}...")
+        first = doc_chunks[0]
+        lines.extend([
+            f"\n📋 First Document Chunk Info:",
+            f"   Chunk Index: {first['chunk_index']}",
+            f"   Total Chunks: {first['total_chunks']}",
+            f"   Chunk Size: {first['chunk_size']} chars",
+            f"   Metadata: {first.get('metadata', {})}",
+            f"   Text Preview: {first['text'][:200]}..."
+        ])
+    
+    print(*lines, sep="\n")
     
-    print("\n" + "=" * 80)
-    print("DEMONSTRATION COMPLETE!")
-    print("=" * 80 + "\n")
+    print("\n" + BAR, "DEMONSTRATION COMPLETE!", BAR + "\n", sep="\n")
 
 
 if __name__ == "__main__":
     main()
-
@@ -1,4 +1,5 @@
 """Script to run the FastAPI application."""
+import os
 import uvicorn
 from src.utils.config_loader import get_config
 
@@ -11,7 +12,11 @@ def main():
     # Get server settings
     host="localhost"
     port = config.get('fastapi.port', 8000)
-    reload = True 
+
+    # Auto-reload is for local development only: it spawns a file watcher
+    # and forces a single worker. Opt in with DEV_RELOAD=1.
+    reload = os.getenv("DEV_RELOAD") == "1"
+    workers = 1 if reload else max(1, int(os.getenv("API_WORKERS", config.get('fastapi.workers', 1))))
     
     print(f"""
     ╔══════════════════════════════════════════════════════════════╗
@@ -30,6 +35,7 @@ def main():
         host=host,
         port=port,
         reload=reload,
+        workers=workers,
         log_level="info"
     )
 
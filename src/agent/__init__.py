@@ -1,6 +1,14 @@
 """Agent modules for transcript analysis."""
-from .transcript_analyzer import TranscriptAnalyzer
-from .audio_processor import AudioProcessor
 
 __all__ = ['TranscriptAnalyzer', 'AudioProcessor']
 
+
+def __getattr__(name):
+    """Import agent classes on first access (PEP 562)."""
+    if name == 'TranscriptAnalyzer':
+        from .transcript_analyzer import TranscriptAnalyzer
+        return TranscriptAnalyzer
+    if name == 'AudioProcessor':
+        from .audio_processor import AudioProcessor
+        return AudioProcessor
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,30 +1,58 @@
 """Audio processing module for transcribing audio files."""
+import hashlib
+import logging
 import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, List, Optional
 from openai import AzureOpenAI
 from src.utils.config_loader import get_config
 from src.utils.logger import setup_logger
+from src.utils.http_client import get_http_client
+
+
+# Repository root; relative cache paths are resolved against it rather than
+# the working directory the server happens to be started from
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# MIME types sent with the multipart upload to Whisper
+AUDIO_CONTENT_TYPES = {
+    'mp3': 'audio/mpeg',
+    'wav': 'audio/wav',
+    'm4a': 'audio/mp4',
+    'ogg': 'audio/ogg'
+}
 
 
 class AudioProcessor:
     """Process audio files and convert to text transcripts."""
 
+    # Shared Azure OpenAI client (one keep-alive connection pool per process)
+    _client: Optional[AzureOpenAI] = None
+    _client_lock = threading.Lock()
+
     def __init__(self):
         """Initialize the audio processor."""
         self.config = get_config()
         self.logger = setup_logger(__name__)
 
         # Configure Azure OpenAI client
-        self.client = AzureOpenAI(
-            api_key=self.config.get('azure_openai.api_key'),
-            api_version=self.config.get('azure_openai.api_version'),
-            azure_endpoint=self.config.get('azure_openai.endpoint')
-        )
+        self.client = self._get_client(self.config)
 
         # Supported audio formats
         self.supported_formats = self.config.get('audio.supported_formats', ['mp3', 'wav', 'm4a', 'ogg'])
         self.max_file_size_mb = self.config.get('audio.max_file_size_mb', 25)
+        self._supported_formats_set = frozenset(self.supported_formats)
+        self._max_file_size_bytes = self.max_file_size_mb * 1024 * 1024
+        self.whisper_deployment = self.config.get('audio.whisper_deployment', 'whisper-1')
+
+        # Transcript cache keyed by SHA-256 of the audio bytes
+        self.cache_enabled = self.config.get('audio.cache_enabled', True)
+        self.cache_file = PROJECT_ROOT / self.config.get('audio.cache_file', 'cache/transcripts.db')
+        self._cache_lock = threading.Lock()
+        self._cache_conn = self._open_cache() if self.cache_enabled else None
     
     def transcribe_audio(self, audio_file_path: str) -> Optional[str]:
         """Transcribe audio file to text using Azure OpenAI Whisper.
@@ -35,62 +63,193 @@ class AudioProcessor:
         Returns:
             Transcribed text or None if transcription fails
         """
-        self.logger.info(f"Starting audio transcription for: {audio_file_path}")
-        
+        self.logger.info("Starting audio transcription for: %s", audio_file_path)
+
+        try:
+            with open(audio_file_path, 'rb') as audio_file:
+                return self.transcribe_stream(audio_file, os.path.basename(audio_file_path))
+        except FileNotFoundError:
+            self.logger.error("Audio file not found: %s", audio_file_path)
+            return None
+
+    def transcribe_stream(self, audio_file: BinaryIO, file_name: str) -> Optional[str]:
+        """Transcribe an open audio file, such as an upload, without copying it to disk.
+
+        Args:
+            audio_file: Seekable binary file positioned anywhere
+            file_name: Original file name (its extension selects the format)
+
+        Returns:
+            Transcribed text or None if transcription fails
+        """
         try:
             # Validate file
-            if not self._validate_audio_file(audio_file_path):
+            if not self._validate_audio(file_name, self._stream_size(audio_file)):
                 return None
             
-            # Read audio file
-            with open(audio_file_path, 'rb') as audio_file:
-                # Use Azure OpenAI Whisper
-                deployment_name = self.config.get('audio.whisper_deployment', 'whisper-1')
-                self.logger.info(f"Using Whisper deployment: {deployment_name}")
+            # Check transcript cache before calling Whisper
+            cache_key = self._hash_stream(audio_file) if self._cache_conn else None
+            if cache_key:
+                cached = self._cache_get(cache_key)
+                if cached is not None:
+                    self.logger.info("Transcript cache hit for: %s", file_name)
+                    return cached
 
-                response = self.client.audio.transcriptions.create(
-                    model=deployment_name,
-                    file=audio_file
-                )
+            # Use Azure OpenAI Whisper
+            deployment_name = self.whisper_deployment
+            self.logger.debug("Using Whisper deployment: %s", deployment_name)
 
-                transcript = response.text
-                self.logger.info(f"Audio transcription completed successfully. Transcript length: {len(transcript)} chars")
-                self.logger.info(f"Transcript preview: {transcript[:200]}...")
-                return transcript
+            # Pass an explicit (name, file, type) tuple so the SDK streams
+            # the open file instead of reading it into memory first
+            extension = os.path.splitext(file_name)[1].lower().lstrip('.')
+            content_type = AUDIO_CONTENT_TYPES.get(extension, 'application/octet-stream')
+
+            response = self.client.audio.transcriptions.create(
+                model=deployment_name,
+                file=(file_name, audio_file, content_type)
+            )
+
+            transcript = response.text
+            self.logger.info("Audio transcription completed successfully. Transcript length: %d chars", len(transcript))
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Transcript preview: %s...", transcript[:200])
+
+            if cache_key and transcript:
+                self._cache_put(cache_key, transcript)
+            return transcript
 
-        except FileNotFoundError:
-            self.logger.error(f"Audio file not found: {audio_file_path}")
-            return None
         except Exception as e:
-            self.logger.error(f"Error during audio transcription: {e}", exc_info=True)
+            self.logger.error("Error during audio transcription: %s", e, exc_info=True)
             return None
     
-    def _validate_audio_file(self, file_path: str) -> bool:
+    def transcribe_batch(self, audio_file_paths: List[str], max_workers: int = 8) -> List[Optional[str]]:
+        """Transcribe several audio files concurrently.
+
+        Requests share the pooled Azure OpenAI client, so total latency is
+        bounded by the slowest file rather than the sum of all of them.
+
+        Args:
+            audio_file_paths: Paths to the audio files
+            max_workers: Maximum number of concurrent transcriptions
+
+        Returns:
+            Transcripts in input order (None for files that failed)
+        """
+        if not audio_file_paths:
+            return []
+
+        workers = max(1, min(max_workers, len(audio_file_paths)))
+        self.logger.info("Transcribing %d audio files with %d workers", len(audio_file_paths), workers)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self.transcribe_audio, audio_file_paths))
+
+    @classmethod
+    def _get_client(cls, config) -> AzureOpenAI:
+        """Get the shared Azure OpenAI client, creating it on first use.
+
+        Args:
+            config: Configuration loader
+
+        Returns:
+            AzureOpenAI client
+        """
+        with cls._client_lock:
+            if cls._client is None:
+                cls._client = AzureOpenAI(
+                    api_key=config.get('azure_openai.api_key'),
+                    api_version=config.get('azure_openai.api_version'),
+                    azure_endpoint=config.get('azure_openai.endpoint'),
+                    http_client=get_http_client()
+                )
+            return cls._client
+
+    def _open_cache(self) -> Optional[sqlite3.Connection]:
+        """Open (or create) the on-disk transcript cache.
+
+        Returns:
+            SQLite connection or None if the cache cannot be opened
+        """
+        try:
+            cache_path = self.cache_file
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(cache_path), check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS transcripts (hash TEXT PRIMARY KEY, transcript TEXT NOT NULL)"
+            )
+            conn.commit()
+            return conn
+        except Exception as e:
+            self.logger.warning("Transcript cache disabled: %s", e)
+            return None
+
+    @staticmethod
+    def _hash_stream(audio_file: BinaryIO, block_size: int = 1024 * 1024) -> str:
+        """Compute the SHA-256 of a file in fixed-size blocks, then rewind it.
+
+        Args:
+            audio_file: Seekable binary file
+            block_size: Number of bytes read per block
+
+        Returns:
+            Hex digest of the file contents
+        """
+        digest = hashlib.sha256()
+        audio_file.seek(0)
+        for block in iter(lambda: audio_file.read(block_size), b''):
+            digest.update(block)
+        audio_file.seek(0)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _stream_size(audio_file: BinaryIO) -> int:
+        """Get the size of a seekable file in bytes and rewind it."""
+        size = audio_file.seek(0, os.SEEK_END)
+        audio_file.seek(0)
+        return size
+
+    def _cache_get(self, key: str) -> Optional[str]:
+        """Look up a cached transcript by content hash."""
+        with self._cache_lock:
+            row = self._cache_conn.execute(
+                "SELECT transcript FROM transcripts WHERE hash = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _cache_put(self, key: str, transcript: str):
+        """Store a transcript under its content hash."""
+        try:
+            with self._cache_lock:
+                self._cache_conn.execute(
+                    "INSERT OR REPLACE INTO transcripts (hash, transcript) VALUES (?, ?)",
+                    (key, transcript)
+                )
+                self._cache_conn.commit()
+        except Exception as e:
+            self.logger.warning("Failed to cache transcript: %s", e)
+
+    def _validate_audio(self, file_name: str, file_size: int) -> bool:
         """Validate audio file format and size.
         
         Args:
-            file_path: Path to the audio file
+            file_name: Name of the audio file
+            file_size: Size of the audio file in bytes
             
         Returns:
             True if valid, False otherwise
         """
-        path = Path(file_path)
-        
-        # Check if file exists
-        if not path.exists():
-            self.logger.error(f"File does not exist: {file_path}")
-            return False
-        
         # Check file extension
-        file_extension = path.suffix.lower().lstrip('.')
-        if file_extension not in self.supported_formats:
-            self.logger.error(f"Unsupported audio format: {file_extension}")
+        file_extension = os.path.splitext(file_name)[1].lower().lstrip('.')
+        if file_extension not in self._supported_formats_set:
+            self.logger.error("Unsupported audio format: %s", file_extension)
             return False
         
         # Check file size
-        file_size_mb = path.stat().st_size / (1024 * 1024)
-        if file_size_mb > self.max_file_size_mb:
-            self.logger.error(f"File size ({file_size_mb:.2f}MB) exceeds maximum ({self.max_file_size_mb}MB)")
+        if file_size > self._max_file_size_bytes:
+            self.logger.error(
+                "File size (%.2fMB) exceeds maximum (%sMB)",
+                file_size / (1024 * 1024), self.max_file_size_mb
+            )
             return False
         
         return True
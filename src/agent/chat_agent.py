@@ -1,62 +1,124 @@
-"""Chat Agent with Agentic AI using LangChain ReAct Agent."""
-import json
-import os
-from typing import Dict, Any, List, Optional
-from langchain_community.chat_models import ChatLiteLLM
-from langchain.agents import AgentExecutor, create_react_agent
-from langchain.tools import Tool
-from langchain_core.prompts import PromptTemplate
-from langchain.memory import ConversationBufferMemory
+"""Chat Agent with Agentic AI using a LangChain tool-calling agent."""
+import re
+from collections import deque
+from typing import AsyncIterator, Dict, Any, List, Optional
+from langchain_openai import AzureChatOpenAI
+from langchain.agents import AgentExecutor, create_tool_calling_agent
+from langchain_core.tools import BaseTool, StructuredTool
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain.memory import ConversationBufferWindowMemory
+from langchain_core.globals import set_llm_cache
+from langchain_core.caches import InMemoryCache
 from src.utils.config_loader import get_config
 from src.utils.logger import setup_logger
-from src.agent.vector_store import MilvusVectorStore
+from src.utils.http_client import get_http_client, get_async_http_client
+from src.agent.vector_store import MilvusVectorStore, get_vector_store, build_context_snippet
+
+# LangChain's LLM cache is process-global; install it only once
+_LLM_CACHE_CONFIGURED = False
+
+# Small talk that never needs a vector search
+_NO_RETRIEVAL_PATTERN = re.compile(
+    r"^\s*(hi|hello|hey|thanks|thank you|bye|goodbye)\b[\s!.?]*$",
+    re.IGNORECASE
+)
+
+# Built once per process and shared by every ChatAgent. Tools are passed to the
+# model as function schemas, so the prompt carries no tool descriptions or
+# Thought/Action format instructions; only the history, input and scratchpad
+# slots are filled per turn.
+_AGENT_PROMPT = ChatPromptTemplate.from_messages([
+    (
+        "system",
+        "You are RASA, an AI assistant for sales transcript analysis. You have access to tools to help answer questions.\n\n"
+        "You must provide crisp, clear, and exact answers (1-2 sentences maximum). You can understand semantic meaning and draw conclusions from context."
+    ),
+    MessagesPlaceholder("chat_history"),
+    ("human", "{input}"),
+    MessagesPlaceholder("agent_scratchpad")
+])
+
+
+def _configure_llm_cache(config):
+    """Install an in-memory LangChain LLM cache if enabled in config."""
+    global _LLM_CACHE_CONFIGURED
+    if _LLM_CACHE_CONFIGURED:
+        return
+    if config.get('llm_cache.enabled', True):
+        set_llm_cache(InMemoryCache(maxsize=config.get('llm_cache.max_size', 256)))
+    _LLM_CACHE_CONFIGURED = True
 
 
 class ChatAgent:
-    """Agentic AI Chat Agent using LangChain ReAct Agent with Tools."""
+    """Agentic AI Chat Agent using a LangChain tool-calling agent."""
 
-    def __init__(self):
-        """Initialize the agentic chat agent."""
+    def __init__(self, vector_store: Optional[MilvusVectorStore] = None, connect: bool = True):
+        """Initialize the agentic chat agent.
+
+        Args:
+            vector_store: Vector store to search (default: the shared store)
+            connect: Open the shared store when none is given; False runs
+                without database search
+        """
         self.config = get_config()
         self.logger = setup_logger(__name__)
 
-        # Configure environment for LiteLLM
-        os.environ["AZURE_API_KEY"] = self.config.get('azure_openai.api_key')
-        os.environ["AZURE_API_BASE"] = self.config.get('azure_openai.endpoint')
-        os.environ["AZURE_API_VERSION"] = self.config.get('azure_openai.api_version')
+        # Azure OpenAI credentials (passed to the client, not via os.environ)
+        self.api_key = self.config.get('azure_openai.api_key')
+        self.api_base = self.config.get('azure_openai.endpoint')
+        self.api_version = self.config.get('azure_openai.api_version')
 
         deployment_name = self.config.get('azure_openai.deployment_name')
 
-        # Initialize LangChain LLM with LiteLLM
-        self.llm = ChatLiteLLM(
-            model=f"azure/{deployment_name}",
+        # Repeated identical prompts are served from the LLM cache
+        _configure_llm_cache(self.config)
+
+        # AzureChatOpenAI streams tool calls natively; AgentExecutor streams the
+        # agent's model calls, so tool use depends on it
+        self.llm = AzureChatOpenAI(
+            azure_deployment=deployment_name,
+            azure_endpoint=self.api_base,
+            api_key=self.api_key,
+            api_version=self.api_version,
             temperature=0.7,
-            max_tokens=1000
+            max_tokens=1000,
+            http_client=get_http_client(),
+            http_async_client=get_async_http_client()
         )
 
         # Initialize vector store
-        try:
-            self.vector_store = MilvusVectorStore()
-            self.db_enabled = True
+        if vector_store is None and connect:
+            try:
+                vector_store = get_vector_store()
+            except Exception as e:
+                self.logger.warning("Vector store not available: %s", e)
+        self.vector_store = vector_store
+        self.db_enabled = vector_store is not None
+        if self.db_enabled:
             self.logger.info("Vector store initialized for chat agent")
-        except Exception as e:
-            self.vector_store = None
-            self.db_enabled = False
-            self.logger.warning(f"Vector store not available: {e}")
 
-        # Initialize conversation memory for the agent
-        self.memory = ConversationBufferMemory(
+        # Initialize conversation memory for the agent (last k exchanges only,
+        # so prompt size stays flat as the session grows)
+        self.memory = ConversationBufferWindowMemory(
+            k=self.config.get('chat.memory_window', 5),
             memory_key="chat_history",
             return_messages=True,
             output_key="output"
         )
 
+        # Formatted history mirrored alongside memory so reads need no message walk;
+        # bounded because the agent lives as long as the process
+        self._history_cache: deque = deque(maxlen=self.config.get('chat.history_size', 100))
+
         # Create tools for the agent
         self.tools = self._create_tools()
 
-        # Create the ReAct agent
+        # Create the tool-calling agent
         self.agent = self._create_agent()
 
+        # Small talk is answered with one plain LLM call: no tool schemas, no search
+        self.direct_chain = _AGENT_PROMPT | self.llm
+
         # Create agent executor
         self.agent_executor = AgentExecutor(
             agent=self.agent,
@@ -67,9 +129,9 @@ class ChatAgent:
             max_iterations=3
         )
 
-        self.logger.info("✅ Agentic AI Chat Agent initialized with LangChain ReAct framework")
+        self.logger.info("✅ Agentic AI Chat Agent initialized with LangChain tool-calling framework")
 
-    def _create_tools(self) -> List[Tool]:
+    def _create_tools(self) -> List[BaseTool]:
         """Create tools for the agent to use."""
         tools = []
 
@@ -90,105 +152,62 @@ class ChatAgent:
             try:
                 search_results = self.vector_store.search_similar_transcripts(
                     query_text=query,
-                    top_k=3
+                    top_k=3,
+                    snippets_only=True
                 )
 
                 if not search_results:
                     return "No relevant documents found in the database."
 
+                # Snippets are pre-rendered at ingest; older rows are rendered here
                 context_parts = []
                 for idx, result in enumerate(search_results, 1):
-                    transcript_text = result.get('transcript_text', '')
-                    analysis = result.get('analysis_result', {})
-
-                    if isinstance(analysis, str):
-                        try:
-                            analysis = json.loads(analysis)
-                        except:
-                            analysis = {}
-
-                    context_parts.append(f"Document {idx}:")
-                    max_context_chars = 2000
-                    if len(transcript_text) > max_context_chars:
-                        context_parts.append(f"Transcript: {transcript_text[:max_context_chars]}...")
-                    else:
-                        context_parts.append(f"Transcript: {transcript_text}")
-
-                    if analysis:
-                        if 'summary' in analysis:
-                            summary = analysis['summary']
-                            if isinstance(summary, dict):
-                                overview = summary.get('overview', '')
-                                sentiment = summary.get('sentiment', '')
-                                context_parts.append(f"Summary: {overview}")
-                                if sentiment:
-                                    context_parts.append(f"Sentiment: {sentiment}")
-                        if 'requirements' in analysis:
-                            reqs = analysis['requirements'][:3]
-                            context_parts.append(f"Requirements: {json.dumps(reqs)}")
-                        if 'key_points' in analysis:
-                            key_points = analysis['key_points'][:5]
-                            context_parts.append(f"Key Points: {json.dumps(key_points)}")
-                        if 'action_items' in analysis:
-                            actions = analysis['action_items'][:3]
-                            context_parts.append(f"Action Items: {json.dumps(actions)}")
-                        if 'recommendations' in analysis:
-                            recs = analysis['recommendations'][:2]
-                            context_parts.append(f"Recommendations: {json.dumps(recs)}")
-
-                    context_parts.append("")
+                    snippet = result.get('context_snippet') or build_context_snippet(
+                        result.get('transcript_text', ''),
+                        result.get('analysis_result', {})
+                    )
+                    context_parts.append(f"Document {idx}:\n{snippet}\n")
 
                 return "\n".join(context_parts)
             except Exception as e:
-                self.logger.error(f"Error searching database: {e}")
+                self.logger.error("Error searching database: %s", e)
                 return f"Error searching database: {str(e)}"
 
-        search_tool = Tool(
-            name="search_database",
+        search_tool = StructuredTool.from_function(
             func=search_database,
+            name="search_database",
             description="Search the vector database for relevant sales transcripts, requirements, and past conversations. Use this when the user asks about specific information from uploaded documents."
         )
         tools.append(search_tool)
 
         return tools
 
-    def _create_agent(self):
-        """Create the ReAct agent with custom prompt."""
-        # ReAct prompt template
-        react_prompt = PromptTemplate.from_template(
-            """You are RASA, an AI assistant for sales transcript analysis. You have access to tools to help answer questions.
-
-You must provide crisp, clear, and exact answers (1-2 sentences maximum). You can understand semantic meaning and draw conclusions from context.
-
-TOOLS:
-{tools}
-
-TOOL NAMES: {tool_names}
-
-Use the following format:
-
-Question: the input question you must answer
-Thought: you should always think about what to do
-Action: the action to take, should be one of [{tool_names}]
-Action Input: the input to the action
-Observation: the result of the action
-... (this Thought/Action/Action Input/Observation can repeat N times)
-Thought: I now know the final answer
-Final Answer: the final answer to the original input question (keep it crisp and short, 1-2 sentences max)
+    @staticmethod
+    def _needs_retrieval(message: str) -> bool:
+        """Check whether a user message may need the agent and its tools.
 
-Begin!
+        Args:
+            message: User message
 
-Chat History:
-{chat_history}
+        Returns:
+            False for greetings and other small talk, True otherwise
+        """
+        return not _NO_RETRIEVAL_PATTERN.match(message)
 
-Question: {input}
-Thought: {agent_scratchpad}"""
-        )
+    def _direct_inputs(self, user_message: str) -> Dict[str, Any]:
+        """Build the prompt inputs for answering without the agent."""
+        return {
+            "input": user_message,
+            "chat_history": self.memory.load_memory_variables({})["chat_history"],
+            "agent_scratchpad": []
+        }
 
-        agent = create_react_agent(
+    def _create_agent(self):
+        """Create the tool-calling agent with custom prompt."""
+        agent = create_tool_calling_agent(
             llm=self.llm,
             tools=self.tools,
-            prompt=react_prompt
+            prompt=_AGENT_PROMPT
         )
 
         return agent
@@ -203,17 +222,66 @@ Thought: {agent_scratchpad}"""
         Returns:
             Dictionary with response and metadata
         """
-        self.logger.info(f"🤖 Agent processing message: {user_message[:100]}...")
+        self.logger.info("🤖 Agent processing message: %.100s...", user_message)
+
+        try:
+            if self._needs_retrieval(user_message):
+                # Use the agent executor to process the message
+                # The agent will decide whether to use tools or answer directly
+                result = self.agent_executor.invoke({
+                    "input": user_message
+                })
+
+                # Extract the answer from agent result
+                answer = result.get("output", "I apologize, but I couldn't generate a response.")
+            else:
+                answer = self.direct_chain.invoke(self._direct_inputs(user_message)).content
+                self.memory.save_context({"input": user_message}, {"output": answer})
+            self._record_turn(user_message, answer)
+
+            self.logger.info("✅ Agent response generated successfully")
+
+            return {
+                "success": True,
+                "answer": answer,
+                "relevant_documents": 0,  # Agent handles this internally
+                "session_id": session_id
+            }
+
+        except Exception as e:
+            self.logger.error("❌ Error in agent execution: %s", e, exc_info=True)
+            return {
+                "success": False,
+                "error": str(e),
+                "answer": "I apologize, but I encountered an error processing your message."
+            }
+
+    async def achat(self, user_message: str, session_id: Optional[str] = None) -> Dict[str, Any]:
+        """Async variant of chat.
+
+        Runs the agent with ainvoke so LLM calls do not block the event loop;
+        the synchronous search tool is run in a worker thread by LangChain.
+
+        Args:
+            user_message: User's message/question
+            session_id: Optional session ID for tracking conversations
+
+        Returns:
+            Dictionary with response and metadata
+        """
+        self.logger.info("🤖 Agent processing message: %.100s...", user_message)
 
         try:
-            # Use the agent executor to process the message
-            # The agent will decide whether to use tools or answer directly
-            result = self.agent_executor.invoke({
-                "input": user_message
-            })
+            if self._needs_retrieval(user_message):
+                result = await self.agent_executor.ainvoke({
+                    "input": user_message
+                })
 
-            # Extract the answer from agent result
-            answer = result.get("output", "I apologize, but I couldn't generate a response.")
+                answer = result.get("output", "I apologize, but I couldn't generate a response.")
+            else:
+                answer = (await self.direct_chain.ainvoke(self._direct_inputs(user_message))).content
+                self.memory.save_context({"input": user_message}, {"output": answer})
+            self._record_turn(user_message, answer)
 
             self.logger.info("✅ Agent response generated successfully")
 
@@ -225,31 +293,95 @@ Thought: {agent_scratchpad}"""
             }
 
         except Exception as e:
-            self.logger.error(f"❌ Error in agent execution: {e}", exc_info=True)
+            self.logger.error("❌ Error in agent execution: %s", e, exc_info=True)
             return {
                 "success": False,
                 "error": str(e),
                 "answer": "I apologize, but I encountered an error processing your message."
             }
-    
+
+    async def astream_chat(self, user_message: str, session_id: Optional[str] = None) -> AsyncIterator[str]:
+        """Stream the agent's answer as it is generated.
+
+        Tool-call steps produce no message content, so the text tokens seen
+        here are the answer itself; callers get the first words without
+        waiting for the full turn.
+
+        Args:
+            user_message: User's message/question
+            session_id: Optional session ID for tracking conversations
+
+        Yields:
+            Chunks of the answer text
+
+        Raises:
+            Exception: Whatever the agent raised, after logging it; part of
+                the answer may already have been yielded
+        """
+        self.logger.info("🤖 Agent streaming message (session %s): %.100s...", session_id, user_message)
+
+        streamed_parts = []
+        final_output = None
+
+        try:
+            if not self._needs_retrieval(user_message):
+                async for chunk in self.direct_chain.astream(self._direct_inputs(user_message)):
+                    if isinstance(chunk.content, str) and chunk.content:
+                        streamed_parts.append(chunk.content)
+                        yield chunk.content
+                answer = "".join(streamed_parts)
+                self.memory.save_context({"input": user_message}, {"output": answer})
+                self._record_turn(user_message, answer)
+                return
+
+            async for event in self.agent_executor.astream_events(
+                {"input": user_message},
+                version="v2"
+            ):
+                kind = event["event"]
+
+                if kind == "on_chat_model_stream":
+                    text = event["data"]["chunk"].content
+                    if isinstance(text, str) and text:
+                        streamed_parts.append(text)
+                        yield text
+
+                elif kind == "on_chain_end" and not event.get("parent_ids"):
+                    output = event["data"].get("output")
+                    if isinstance(output, dict):
+                        final_output = output.get("output")
+
+            # Cached or non-streaming responses emit no tokens; send the final output instead
+            if not streamed_parts and final_output:
+                yield final_output
+
+            self._record_turn(user_message, final_output or "".join(streamed_parts))
+
+            self.logger.info("✅ Agent response streamed successfully")
+
+        except Exception as e:
+            self.logger.error("❌ Error in agent streaming: %s", e, exc_info=True)
+            raise
+
+    def _record_turn(self, user_message: str, answer: str):
+        """Mirror a completed turn into the formatted history cache."""
+        self._history_cache.append({"role": "user", "content": user_message})
+        self._history_cache.append({"role": "assistant", "content": answer})
+
     def clear_memory(self):
         """Clear conversation memory."""
         self.memory.clear()
+        self._history_cache.clear()
         self.logger.info("Agent conversation memory cleared")
 
     def get_chat_history(self) -> List[Dict[str, str]]:
-        """Get formatted chat history from agent memory.
+        """Get formatted chat history.
+
+        Served from the history mirrored on each turn rather than by
+        re-walking the memory's message objects.
 
         Returns:
-            List of message dictionaries
+            List of message dictionaries (the most recent chat.history_size)
         """
-        messages = self.memory.chat_memory.messages
-        history = []
-        for msg in messages:
-            if hasattr(msg, 'type'):
-                history.append({
-                    "role": "user" if msg.type == "human" else "assistant",
-                    "content": msg.content
-                })
-        return history
+        return list(self._history_cache)
 
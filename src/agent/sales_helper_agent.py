@@ -1,17 +1,26 @@
 """Sales Helper Agent with Agentic Approach using LiteLLM."""
+import asyncio
 import json
 import litellm
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from src.utils.config_loader import get_config
 from src.utils.logger import setup_logger
-from src.agent.vector_store import MilvusVectorStore
+from src.utils.http_client import configure_litellm_clients
+from src.utils.cache import LRUCache, hash_key
+from src.agent.vector_store import MilvusVectorStore, get_vector_store
 
 
 class SalesHelperAgent:
     """Agentic sales helper that captures requirements and searches database using LiteLLM."""
 
-    def __init__(self):
-        """Initialize the sales helper agent."""
+    def __init__(self, vector_store: Optional[MilvusVectorStore] = None, connect: bool = True):
+        """Initialize the sales helper agent.
+
+        Args:
+            vector_store: Vector store to search (default: the shared store)
+            connect: Open the shared store when none is given; False runs
+                without database search
+        """
         self.config = get_config()
         self.logger = setup_logger(__name__)
 
@@ -21,126 +30,231 @@ class SalesHelperAgent:
         self.api_version = self.config.get('azure_openai.api_version')
         self.deployment_name = self.config.get('azure_openai.deployment_name')
 
-        # Set LiteLLM configuration
-        litellm.api_key = self.api_key
-        litellm.api_base = self.api_base
-        litellm.api_version = self.api_version
-        
+        # Credentials are passed per call; only the shared HTTP clients are global
+        configure_litellm_clients()
+
+        # Prompt templates (resolved once instead of per call)
+        self.system_prompt = self.config.get_prompt('sales_helper_system_prompt')
+        self.extraction_prompt = self.config.get_prompt('requirement_extraction_prompt')
+        self.recommendation_prompt = self.config.get_prompt('sales_recommendation_prompt')
+
         # Initialize vector store for database search
-        try:
-            self.vector_store = MilvusVectorStore()
-            self.db_enabled = True
+        if vector_store is None and connect:
+            try:
+                vector_store = get_vector_store()
+            except Exception as e:
+                self.logger.warning("Vector store not available: %s", e)
+        self.vector_store = vector_store
+        self.db_enabled = vector_store is not None
+        if self.db_enabled:
             self.logger.info("Vector store initialized for sales helper agent")
-        except Exception as e:
-            self.vector_store = None
-            self.db_enabled = False
-            self.logger.warning(f"Vector store not available: {e}")
-        
+
+        # Cache of LLM responses keyed by the full request
+        self.response_cache = LRUCache(
+            max_size=self.config.get('llm_cache.max_size', 256),
+            ttl=self.config.get('llm_cache.ttl_seconds')
+        ) if self.config.get('llm_cache.enabled', True) else None
+
+        # Bound on in-flight async LLM calls (keeps bursts under Azure rate limits)
+        self.max_concurrent_requests = self.config.get('azure_openai.max_concurrent_requests', 10)
+        self._llm_semaphore: Optional[asyncio.Semaphore] = None
+        self._llm_semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
         # Agent state
         self.conversation_history = []
-        
+
     def process_salesperson_input(self, user_input: str) -> Dict[str, Any]:
         """Process salesperson input with agentic approach.
-        
+
         Args:
             user_input: Input from salesperson describing client needs
-            
+
         Returns:
             Dictionary with extracted requirements and search results
         """
         self.logger.info("Processing salesperson input with agentic approach")
-        
+
         try:
             # Step 1: Extract requirements from salesperson input
             requirements = self._extract_requirements(user_input)
-            
+
             # Step 2: Search database for similar cases
             search_results = []
             if self.db_enabled and requirements:
                 search_results = self._search_similar_cases(requirements)
-            
+
             # Step 3: Generate recommendations based on requirements and search results
             recommendations = self._generate_recommendations(
-                user_input, 
-                requirements, 
+                user_input,
+                requirements,
                 search_results
             )
-            
+
             # Step 4: Update conversation history
-            self.conversation_history.append({
-                "input": user_input,
-                "requirements": requirements,
-                "recommendations": recommendations
-            })
-            
+            return self._record_result(user_input, requirements, search_results, recommendations)
+
+        except Exception as e:
+            self.logger.error("Error processing salesperson input: %s", e, exc_info=True)
             return {
-                "success": True,
-                "requirements": requirements,
-                "search_results": search_results,
-                "recommendations": recommendations,
-                "conversation_id": len(self.conversation_history)
+                "success": False,
+                "error": str(e)
             }
-            
+
+    async def aprocess_salesperson_input(self, user_input: str) -> Dict[str, Any]:
+        """Async variant of process_salesperson_input.
+
+        LLM calls use litellm.acompletion and the Milvus search runs in a worker
+        thread, so concurrent requests overlap their network waits instead of
+        blocking the event loop.
+
+        Args:
+            user_input: Input from salesperson describing client needs
+
+        Returns:
+            Dictionary with extracted requirements and search results
+        """
+        self.logger.info("Processing salesperson input with agentic approach (async)")
+
+        try:
+            requirements, search_results, recommendations = await self._arun_pipeline(user_input)
+            return self._record_result(user_input, requirements, search_results, recommendations)
+
         except Exception as e:
-            self.logger.error(f"Error processing salesperson input: {e}", exc_info=True)
+            self.logger.error("Error processing salesperson input: %s", e, exc_info=True)
             return {
                 "success": False,
                 "error": str(e)
             }
-    
+
+    def process_batch(self, user_inputs: List[str]) -> List[Dict[str, Any]]:
+        """Process several salesperson inputs concurrently.
+
+        Must be called from synchronous code; use aprocess_batch inside an
+        event loop.
+
+        Args:
+            user_inputs: Inputs from salespeople describing client needs
+
+        Returns:
+            Results in the same order as the inputs
+        """
+        return asyncio.run(self.aprocess_batch(user_inputs))
+
+    async def aprocess_batch(self, user_inputs: List[str]) -> List[Dict[str, Any]]:
+        """Process several salesperson inputs concurrently.
+
+        Inputs fan out in parallel; in-flight LLM calls are still capped by
+        max_concurrent_requests. Conversation history is recorded in input order.
+
+        Args:
+            user_inputs: Inputs from salespeople describing client needs
+
+        Returns:
+            Results in the same order as the inputs
+        """
+        self.logger.info("Processing batch of %s salesperson inputs", len(user_inputs))
+
+        outcomes = await asyncio.gather(
+            *(self._arun_pipeline(user_input) for user_input in user_inputs),
+            return_exceptions=True
+        )
+
+        results = []
+        for user_input, outcome in zip(user_inputs, outcomes):
+            if isinstance(outcome, Exception):
+                self.logger.error("Error processing salesperson input: %s", outcome)
+                results.append({"success": False, "error": str(outcome)})
+            else:
+                results.append(self._record_result(user_input, *outcome))
+        return results
+
+    async def _arun_pipeline(
+        self,
+        user_input: str
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Run extraction, search and recommendation for one input."""
+        requirements = await self._aextract_requirements(user_input)
+
+        search_results = []
+        if self.db_enabled and requirements:
+            search_results = await asyncio.to_thread(self._search_similar_cases, requirements)
+
+        recommendations = await self._agenerate_recommendations(
+            user_input,
+            requirements,
+            search_results
+        )
+
+        return requirements, search_results, recommendations
+
+    def _record_result(
+        self,
+        user_input: str,
+        requirements: List[Dict[str, Any]],
+        search_results: List[Dict[str, Any]],
+        recommendations: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Append a turn to the conversation history and build the response."""
+        self.conversation_history.append({
+            "input": user_input,
+            "requirements": requirements,
+            "recommendations": recommendations
+        })
+
+        return {
+            "success": True,
+            "requirements": requirements,
+            "search_results": search_results,
+            "recommendations": recommendations,
+            "conversation_id": len(self.conversation_history)
+        }
+
     def _extract_requirements(self, user_input: str) -> List[Dict[str, Any]]:
         """Extract structured requirements from salesperson input.
-        
+
         Args:
             user_input: Salesperson's description of client needs
-            
+
         Returns:
             List of extracted requirements
         """
         self.logger.info("Extracting requirements from input")
-        
+
         try:
-            system_prompt = self.config.get_prompt('sales_helper_system_prompt')
-            extraction_prompt = self.config.get_prompt('requirement_extraction_prompt')
-            
-            user_prompt = extraction_prompt.format(input=user_input)
-            
+            system_prompt, user_prompt = self._build_extraction_prompts(user_input)
+
             # Use LiteLLM with JSON mode
-            response = litellm.completion(
-                model=f"azure/{self.deployment_name}",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                api_key=self.api_key,
-                api_base=self.api_base,
-                api_version=self.api_version,
-                temperature=0.3,
-                max_tokens=1500,
-                response_format={"type": "json_object"}
-            )
+            content = self._complete_json(system_prompt, user_prompt, temperature=0.3, max_tokens=1500)
+            return self._parse_requirements(content)
 
-            content = response.choices[0].message.content
+        except Exception as e:
+            self.logger.error("Error extracting requirements: %s", e)
+            return []
 
-            # Clean response - remove markdown code blocks if present
-            content = content.strip()
-            if content.startswith("```json"):
-                content = content[7:]
-            if content.startswith("```"):
-                content = content[3:]
-            if content.endswith("```"):
-                content = content[:-3]
-            content = content.strip()
+    async def _aextract_requirements(self, user_input: str) -> List[Dict[str, Any]]:
+        """Async variant of _extract_requirements."""
+        self.logger.info("Extracting requirements from input")
 
-            result = json.loads(content)
+        try:
+            system_prompt, user_prompt = self._build_extraction_prompts(user_input)
+            content = await self._acomplete_json(system_prompt, user_prompt, temperature=0.3, max_tokens=1500)
+            return self._parse_requirements(content)
 
-            self.logger.info(f"Extracted {len(result.get('requirements', []))} requirements")
-            return result.get('requirements', [])
-            
         except Exception as e:
-            self.logger.error(f"Error extracting requirements: {e}")
+            self.logger.error("Error extracting requirements: %s", e)
             return []
-    
+
+    def _build_extraction_prompts(self, user_input: str) -> Tuple[str, str]:
+        """Build the system and user prompts for requirement extraction."""
+        return self.system_prompt, self.extraction_prompt.format(input=user_input)
+
+    def _parse_requirements(self, content: str) -> List[Dict[str, Any]]:
+        """Parse the requirement extraction response."""
+        result = self._parse_json_content(content)
+
+        self.logger.info("Extracted %s requirements", len(result.get('requirements', [])))
+        return result.get('requirements', [])
+
     def _search_similar_cases(self, requirements: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Search database for similar past cases.
 
@@ -159,7 +273,7 @@ class SalesHelperAgent:
         try:
             # Create search query from requirements
             search_query = " ".join([req.get('requirement', '') for req in requirements])
-            self.logger.info(f"Search query: {search_query[:100]}...")
+            self.logger.info("Search query: %.100s...", search_query)
 
             # Search vector store
             results = self.vector_store.search_similar_transcripts(
@@ -167,11 +281,11 @@ class SalesHelperAgent:
                 top_k=3
             )
 
-            self.logger.info(f"✅ Found {len(results)} similar cases from database")
+            self.logger.info("✅ Found %s similar cases from database", len(results))
             return results
-            
+
         except Exception as e:
-            self.logger.error(f"Error searching database: {e}")
+            self.logger.error("Error searching database: %s", e)
             return []
 
     def _generate_recommendations(
@@ -193,65 +307,195 @@ class SalesHelperAgent:
         self.logger.info("Generating recommendations")
 
         try:
-            system_prompt = self.config.get_prompt('sales_helper_system_prompt')
-            recommendation_prompt = self.config.get_prompt('sales_recommendation_prompt')
-
-            # Format search results for context
-            context = ""
-            if search_results:
-                context = "Similar past cases:\n"
-                for idx, result in enumerate(search_results[:3], 1):
-                    context += f"\nCase {idx}:\n"
-                    context += f"Transcript: {result.get('transcript_text', '')[:200]}...\n"
-                    analysis = result.get('analysis_result', {})
-                    if isinstance(analysis, str):
-                        analysis = json.loads(analysis)
-                    context += f"Recommendations: {json.dumps(analysis.get('recommendations', []))}\n"
-
-            user_prompt = recommendation_prompt.format(
-                input=user_input,
-                requirements=json.dumps(requirements, indent=2),
-                context=context
+            system_prompt, user_prompt = self._build_recommendation_prompts(
+                user_input, requirements, search_results
             )
 
             # Use LiteLLM with JSON mode
-            response = litellm.completion(
-                model=f"azure/{self.deployment_name}",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                api_key=self.api_key,
-                api_base=self.api_base,
-                api_version=self.api_version,
-                temperature=0.7,
-                max_tokens=2000,
-                response_format={"type": "json_object"}
-            )
-
-            content = response.choices[0].message.content
+            content = self._complete_json(system_prompt, user_prompt, temperature=0.7, max_tokens=2000)
+            return self._parse_recommendations(content)
 
-            # Clean response - remove markdown code blocks if present
-            content = content.strip()
-            if content.startswith("```json"):
-                content = content[7:]
-            if content.startswith("```"):
-                content = content[3:]
-            if content.endswith("```"):
-                content = content[:-3]
-            content = content.strip()
+        except Exception as e:
+            self.logger.error("Error generating recommendations: %s", e)
+            return []
 
-            result = json.loads(content)
+    async def _agenerate_recommendations(
+        self,
+        user_input: str,
+        requirements: List[Dict[str, Any]],
+        search_results: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Async variant of _generate_recommendations."""
+        self.logger.info("Generating recommendations")
 
-            self.logger.info(f"Generated {len(result.get('recommendations', []))} recommendations")
-            return result.get('recommendations', [])
+        try:
+            system_prompt, user_prompt = self._build_recommendation_prompts(
+                user_input, requirements, search_results
+            )
+            content = await self._acomplete_json(system_prompt, user_prompt, temperature=0.7, max_tokens=2000)
+            return self._parse_recommendations(content)
 
         except Exception as e:
-            self.logger.error(f"Error generating recommendations: {e}")
+            self.logger.error("Error generating recommendations: %s", e)
             return []
 
+    def _build_recommendation_prompts(
+        self,
+        user_input: str,
+        requirements: List[Dict[str, Any]],
+        search_results: List[Dict[str, Any]]
+    ) -> Tuple[str, str]:
+        """Build the system and user prompts for recommendation generation."""
+        # Format search results for context
+        context = ""
+        if search_results:
+            context = "Similar past cases:\n"
+            for idx, result in enumerate(search_results[:3], 1):
+                context += f"\nCase {idx}:\n"
+                context += f"Transcript: {result.get('transcript_text', '')[:200]}...\n"
+                analysis = result.get('analysis_result', {})
+                context += f"Recommendations: {json.dumps(analysis.get('recommendations', []))}\n"
+
+        user_prompt = self.recommendation_prompt.format(
+            input=user_input,
+            requirements=json.dumps(requirements, indent=2),
+            context=context
+        )
+
+        return self.system_prompt, user_prompt
+
+    def _parse_recommendations(self, content: str) -> List[Dict[str, Any]]:
+        """Parse the recommendation generation response."""
+        result = self._parse_json_content(content)
+
+        self.logger.info("Generated %s recommendations", len(result.get('recommendations', [])))
+        return result.get('recommendations', [])
+
+    @staticmethod
+    def _parse_json_content(content: str) -> Dict[str, Any]:
+        """Parse a JSON response, removing markdown code fences if present.
+
+        JSON mode normally returns a bare object, so that is parsed directly;
+        fence stripping only runs if the first parse fails.
+        """
+        try:
+            return json.loads(content)
+        except json.JSONDecodeError:
+            pass
+
+        content = content.strip()
+        if content.startswith("```json"):
+            content = content[7:]
+        if content.startswith("```"):
+            content = content[3:]
+        if content.endswith("```"):
+            content = content[:-3]
+        content = content.strip()
+
+        return json.loads(content)
+
+    def _completion_kwargs(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        max_tokens: int
+    ) -> Dict[str, Any]:
+        """Build the LiteLLM request arguments for a JSON-mode completion."""
+        return {
+            "model": f"azure/{self.deployment_name}",
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            "api_key": self.api_key,
+            "api_base": self.api_base,
+            "api_version": self.api_version,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "response_format": {"type": "json_object"}
+        }
+
+    def _complete_json(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        max_tokens: int
+    ) -> str:
+        """Run a JSON-mode completion, reusing cached responses for identical requests.
+
+        Args:
+            system_prompt: System message content
+            user_prompt: User message content
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+
+        Returns:
+            Raw response content
+        """
+        cache_key = self._response_cache_key(system_prompt, user_prompt, temperature, max_tokens)
+        if cache_key is not None:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                self.logger.info("LLM response cache hit")
+                return cached
+
+        response = litellm.completion(
+            **self._completion_kwargs(system_prompt, user_prompt, temperature, max_tokens)
+        )
+
+        content = response.choices[0].message.content
+        if cache_key is not None:
+            self.response_cache.set(cache_key, content)
+        return content
+
+    async def _acomplete_json(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        max_tokens: int
+    ) -> str:
+        """Async variant of _complete_json, bounded by max_concurrent_requests."""
+        cache_key = self._response_cache_key(system_prompt, user_prompt, temperature, max_tokens)
+        if cache_key is not None:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                self.logger.info("LLM response cache hit")
+                return cached
+
+        async with self._get_llm_semaphore():
+            response = await litellm.acompletion(
+                **self._completion_kwargs(system_prompt, user_prompt, temperature, max_tokens)
+            )
+
+        content = response.choices[0].message.content
+        if cache_key is not None:
+            self.response_cache.set(cache_key, content)
+        return content
+
+    def _get_llm_semaphore(self) -> asyncio.Semaphore:
+        """Get the semaphore bounding async LLM calls for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._llm_semaphore is None or self._llm_semaphore_loop is not loop:
+            self._llm_semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+            self._llm_semaphore_loop = loop
+        return self._llm_semaphore
+
+    def _response_cache_key(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        max_tokens: int
+    ) -> Optional[str]:
+        """Build the response cache key, or None when caching is disabled."""
+        if self.response_cache is None:
+            return None
+        return hash_key(self.deployment_name, temperature, max_tokens, system_prompt, user_prompt)
+
     def reset_conversation(self):
         """Reset conversation history."""
         self.conversation_history = []
         self.logger.info("Conversation history reset")
-
@@ -1,15 +1,57 @@
 """Sales transcript analyzer using LiteLLM with LangChain text chunking."""
-import json
+import asyncio
+import logging
+import re
+import threading
+import time
 import litellm
-from typing import Dict, Any, Optional
+import orjson
+import tiktoken
+from functools import lru_cache
+from openai import AzureOpenAI
+from typing import Dict, Any, List, Optional, Tuple
 from src.utils.config_loader import get_config
 from src.utils.logger import setup_logger
-from src.utils.text_chunker import TextChunker
+from src.utils.http_client import configure_litellm_clients, get_http_client
+from src.utils.cache import LRUCache, hash_key
+from src.utils.text_chunker import get_text_chunker
+
+# Optional markdown code fences around a JSON response (either fence may be missing)
+_FENCE_RE = re.compile(r"^\s*(?:```(?:json)?)?\s*(.*?)\s*(?:```)?\s*$", re.DOTALL)
+
+# Stand-in for the transcript while a prompt template is split around it
+_TRANSCRIPT_MARKER = "\x00transcript\x00"
+
+# Plain-text tasks: result key -> (prompt attribute, temperature, max_tokens)
+TEXT_TASKS = {
+    "requirements": ("requirements_prompt", 0.5, 1500),
+    "recommendations": ("recommendations_prompt", 0.7, 1500),
+    "summary": ("summary_prompt", 0.5, 1000)
+}
+
+# Approximate tokens the chat format adds around each message
+MESSAGE_TOKEN_OVERHEAD = 4
+
+# Batch job states after which polling stops
+BATCH_TERMINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(model_name: str) -> tiktoken.Encoding:
+    """Get the (cached) tiktoken encoding for a model."""
+    try:
+        return tiktoken.encoding_for_model(model_name)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
 
 
 class TranscriptAnalyzer:
     """Analyze sales conversation transcripts using LiteLLM with LangChain chunking."""
 
+    # Shared Azure OpenAI client for Batch API jobs (one connection pool per process)
+    _batch_client: Optional[AzureOpenAI] = None
+    _batch_client_lock = threading.Lock()
+
     def __init__(self):
         """Initialize the transcript analyzer."""
         self.config = get_config()
@@ -20,18 +62,86 @@ class TranscriptAnalyzer:
         self.api_base = self.config.get('azure_openai.endpoint')
         self.api_version = self.config.get('azure_openai.api_version')
         self.deployment_name = self.config.get('azure_openai.deployment_name')
+        self.model = f"azure/{self.deployment_name}"
+        self.temperature = self.config.get('azure_openai.temperature', 0.7)
+        self.max_tokens = self.config.get('azure_openai.max_tokens', 2000)
+        self.model_name = self.config.get('azure_openai.model_name', 'gpt-4o')
+        self.context_window = self.config.get('azure_openai.context_window', 128000)
+        # Transient errors (rate limits, timeouts) are retried with backoff by LiteLLM
+        self.num_retries = self.config.get('azure_openai.num_retries', 3)
+        self.max_concurrent_requests = self.config.get('azure_openai.max_concurrent_requests', 10)
+        # Batch jobs must target a Global-Batch deployment
+        self.batch_deployment_name = self.config.get('azure_openai.batch_deployment_name') or self.deployment_name
+
+        # Credentials are passed on every call rather than through LiteLLM's
+        # module globals, so analyzers never clobber each other's settings
+        configure_litellm_clients()
+
+        # Cache of results keyed by task and transcript hash (repeat analyses skip the LLM)
+        self.response_cache = LRUCache(
+            max_size=self.config.get('llm_cache.max_size', 256),
+            ttl=self.config.get('llm_cache.ttl_seconds')
+        ) if self.config.get('llm_cache.enabled', True) else None
+
+        # Async analyses currently running, keyed by transcript hash; concurrent
+        # requests for the same transcript share one LLM call
+        self._inflight: Dict[str, asyncio.Future] = {}
 
-        # Set LiteLLM configuration
-        litellm.api_key = self.api_key
-        litellm.api_base = self.api_base
-        litellm.api_version = self.api_version
+        # Prompt templates are read once here instead of on every call
+        self.reload_prompts()
 
         # Initialize text chunker (LangChain)
-        self.chunker = TextChunker()
+        self.chunker = get_text_chunker()
 
-        self.logger.info(f"LiteLLM configured with Azure OpenAI deployment: {self.deployment_name}")
-        self.logger.info(f"LangChain text chunker initialized")
+        self.logger.info("LiteLLM configured with Azure OpenAI deployment: %s", self.deployment_name)
+        self.logger.info("LangChain text chunker initialized")
     
+    def reload_prompts(self):
+        """Refresh the cached prompt templates from the configuration.
+
+        User prompts are stored as prebuilt messages before and after the
+        transcript, so the transcript is sent as its own message instead of
+        being copied into every formatted prompt.
+
+        Raises:
+            ValueError: If a user prompt does not contain exactly one {transcript}
+        """
+        self.cache_clear()
+        self.system_prompt = self.config.get_prompt('system_prompt')
+        self.analysis_prompt = self._split_prompt('analysis_prompt')
+        self.requirements_prompt = self._split_prompt('requirements_extraction_prompt')
+        self.recommendations_prompt = self._split_prompt('recommendations_prompt')
+        self.summary_prompt = self._split_prompt('summary_prompt')
+
+    def cache_clear(self):
+        """Drop all cached analysis results."""
+        if self.response_cache is not None:
+            self.response_cache.clear()
+
+    def _split_prompt(self, prompt_name: str) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+        """Split a prompt template into the messages before and after {transcript}.
+
+        The system message and the static prompt text are built into message
+        dicts once here, so each request only adds the transcript message.
+
+        Args:
+            prompt_name: Name of the user prompt in prompts.yaml
+
+        Returns:
+            (leading messages, trailing messages) around the transcript
+        """
+        rendered = self.config.get_prompt(prompt_name).format(transcript=_TRANSCRIPT_MARKER)
+        parts = rendered.split(_TRANSCRIPT_MARKER)
+        if len(parts) != 2:
+            raise ValueError(f"Prompt '{prompt_name}' must contain exactly one {{transcript}} placeholder")
+
+        prefix, suffix = parts[0].strip(), parts[1].strip()
+        leading = [{"role": "system", "content": self.system_prompt}]
+        if prefix:
+            leading.append({"role": "user", "content": prefix})
+        trailing = [{"role": "user", "content": suffix}] if suffix else []
+        return leading, trailing
+
     def analyze_transcript(self, transcript: str) -> Dict[str, Any]:
         """Analyze a sales conversation transcript using LiteLLM with LangChain chunking.
 
@@ -43,66 +153,108 @@ class TranscriptAnalyzer:
         """
         self.logger.info("Starting transcript analysis with LiteLLM + LangChain chunking")
 
+        cache_key = self._response_cache_key("analysis", transcript)
+        cached = self._cached_response(cache_key)
+        if cached is not None:
+            return cached
+
         try:
-            # Demonstrate chunking if text is long
-            if len(transcript) > 5000:
-                self.logger.info(f"Transcript is long ({len(transcript)} chars), demonstrating chunking...")
-                chunks = self.chunker.chunk_text_recursive(transcript)
-                stats = self.chunker.get_chunk_stats(chunks)
-                self.logger.info(f"📊 Chunking Stats: {stats['total_chunks']} chunks, "
-                               f"avg size: {stats['avg_chunk_size']} chars")
-
-            # Get prompts
-            system_prompt = self.config.get_prompt('system_prompt')
-            analysis_prompt = self.config.get_prompt('analysis_prompt')
-
-            # Format the analysis prompt with transcript
-            user_prompt = analysis_prompt.format(transcript=transcript)
-
-            self.logger.info(f"Calling LiteLLM with Azure deployment: {self.deployment_name}")
-
-            # Call LiteLLM with Azure OpenAI (supports JSON mode)
-            response = litellm.completion(
-                model=f"azure/{self.deployment_name}",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                api_key=self.api_key,
-                api_base=self.api_base,
-                api_version=self.api_version,
-                temperature=self.config.get('azure_openai.temperature', 0.7),
-                max_tokens=self.config.get('azure_openai.max_tokens', 2000),
-                response_format={"type": "json_object"}
-            )
+            self._log_chunking(transcript)
+            self._check_context_window(self.analysis_prompt, transcript, self.max_tokens)
 
-            # Extract and parse response
-            content = response.choices[0].message.content
-            self.logger.info(f"LiteLLM Response: {content[:200]}...")
-
-            # Clean response - remove markdown code blocks if present
-            content = content.strip()
-            if content.startswith("```json"):
-                content = content[7:]  # Remove ```json
-            if content.startswith("```"):
-                content = content[3:]  # Remove ```
-            if content.endswith("```"):
-                content = content[:-3]  # Remove trailing ```
-            content = content.strip()
-
-            analysis_result = json.loads(content)
-            self.logger.info(f"Parsed result keys: {list(analysis_result.keys())}")
-
-            self.logger.info("Transcript analysis completed successfully")
-            return analysis_result
-
-        except json.JSONDecodeError as e:
-            self.logger.error(f"Failed to parse response as JSON: {e}")
+            self.logger.info("Calling LiteLLM with Azure deployment: %s", self.deployment_name)
+
+            # Call LiteLLM with Azure OpenAI (supports JSON mode); the response is
+            # streamed so a non-JSON reply is rejected on its first token
+            stream = litellm.completion(**self._analysis_kwargs(transcript), stream=True)
+
+            parts = []
+            for chunk in stream:
+                self._append_delta(parts, chunk)
+
+            return self._store_response(cache_key, self._parse_analysis("".join(parts)))
+
+        except orjson.JSONDecodeError as e:
+            self.logger.error("Failed to parse response as JSON: %s", e)
             return self._get_error_response("Failed to parse analysis results")
         except Exception as e:
-            self.logger.error(f"Error during transcript analysis: {e}")
+            self.logger.error("Error during transcript analysis: %s", e)
             return self._get_error_response(str(e))
-    
+
+    async def aanalyze_transcript(self, transcript: str) -> Dict[str, Any]:
+        """Async variant of analyze_transcript.
+
+        If the same transcript is already being analyzed, the call waits for
+        that result instead of sending a second request.
+
+        Args:
+            transcript: The conversation transcript text
+
+        Returns:
+            Dictionary containing analysis results with requirements, recommendations, and summary
+        """
+        self.logger.info("Starting transcript analysis with LiteLLM + LangChain chunking (async)")
+
+        cache_key = self._response_cache_key("analysis", transcript)
+        cached = self._cached_response(cache_key)
+        if cached is not None:
+            return cached
+
+        inflight_key = cache_key or hash_key("analysis", transcript)
+        pending = self._inflight.get(inflight_key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._aanalyze_uncached(transcript, cache_key))
+            self._inflight[inflight_key] = pending
+            pending.add_done_callback(lambda _: self._inflight.pop(inflight_key, None))
+        else:
+            self.logger.info("Joining in-flight analysis of the same transcript")
+
+        # Shielded so one caller going away does not cancel the others' result
+        return dict(await asyncio.shield(pending))
+
+    async def _aanalyze_uncached(self, transcript: str, cache_key: Optional[str]) -> Dict[str, Any]:
+        """Run the async analysis LLM call and cache a successful result."""
+        try:
+            self._log_chunking(transcript)
+            self._check_context_window(self.analysis_prompt, transcript, self.max_tokens)
+
+            stream = await litellm.acompletion(**self._analysis_kwargs(transcript), stream=True)
+
+            parts = []
+            async for chunk in stream:
+                self._append_delta(parts, chunk)
+
+            return self._store_response(cache_key, self._parse_analysis("".join(parts)))
+
+        except orjson.JSONDecodeError as e:
+            self.logger.error("Failed to parse response as JSON: %s", e)
+            return self._get_error_response("Failed to parse analysis results")
+        except Exception as e:
+            self.logger.error("Error during transcript analysis: %s", e)
+            return self._get_error_response(str(e))
+
+    def get_cached_analysis(self, transcript: str) -> Optional[Dict[str, Any]]:
+        """Get the cached analysis of an identical transcript without calling the LLM.
+
+        Args:
+            transcript: The conversation transcript text
+
+        Returns:
+            Copy of the cached analysis, or None if it is not cached
+        """
+        return self._cached_response(self._response_cache_key("analysis", transcript))
+
+    async def awarmup(self):
+        """Send a one-token completion to open the connection to the LLM deployment."""
+        await litellm.acompletion(
+            model=self.model,
+            messages=[{"role": "user", "content": "ping"}],
+            api_key=self.api_key,
+            api_base=self.api_base,
+            api_version=self.api_version,
+            max_tokens=1
+        )
+
     def extract_requirements(self, transcript: str) -> Dict[str, Any]:
         """Extract client requirements from transcript.
         
@@ -112,35 +264,11 @@ class TranscriptAnalyzer:
         Returns:
             Dictionary containing extracted requirements
         """
-        self.logger.info("Extracting requirements from transcript")
-        
-        try:
-            system_prompt = self.config.get_prompt('system_prompt')
-            requirements_prompt = self.config.get_prompt('requirements_extraction_prompt')
-            
-            user_prompt = requirements_prompt.format(transcript=transcript)
-            
-            deployment_name = self.config.get('azure_openai.deployment_name')
-            model = f"azure/{deployment_name}"
-            
-            response = litellm.completion(
-                model=model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.5,
-                max_tokens=1500
-            )
-            
-            content = response.choices[0].message.content
-            
-            self.logger.info("Requirements extraction completed")
-            return {"requirements": content}
-            
-        except Exception as e:
-            self.logger.error(f"Error extracting requirements: {e}")
-            return {"error": str(e)}
+        return self._run_text_task("requirements", transcript)
+
+    async def aextract_requirements(self, transcript: str) -> Dict[str, Any]:
+        """Async variant of extract_requirements."""
+        return await self._arun_text_task("requirements", transcript)
     
     def generate_recommendations(self, transcript: str) -> Dict[str, Any]:
         """Generate product recommendations based on transcript.
@@ -151,35 +279,11 @@ class TranscriptAnalyzer:
         Returns:
             Dictionary containing recommendations
         """
-        self.logger.info("Generating recommendations from transcript")
-        
-        try:
-            system_prompt = self.config.get_prompt('system_prompt')
-            recommendations_prompt = self.config.get_prompt('recommendations_prompt')
-            
-            user_prompt = recommendations_prompt.format(transcript=transcript)
-            
-            deployment_name = self.config.get('azure_openai.deployment_name')
-            model = f"azure/{deployment_name}"
-            
-            response = litellm.completion(
-                model=model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.7,
-                max_tokens=1500
-            )
-            
-            content = response.choices[0].message.content
-            
-            self.logger.info("Recommendations generation completed")
-            return {"recommendations": content}
-            
-        except Exception as e:
-            self.logger.error(f"Error generating recommendations: {e}")
-            return {"error": str(e)}
+        return self._run_text_task("recommendations", transcript)
+
+    async def agenerate_recommendations(self, transcript: str) -> Dict[str, Any]:
+        """Async variant of generate_recommendations."""
+        return await self._arun_text_task("recommendations", transcript)
     
     def generate_summary(self, transcript: str) -> Dict[str, Any]:
         """Generate summary of the conversation.
@@ -190,36 +294,407 @@ class TranscriptAnalyzer:
         Returns:
             Dictionary containing summary
         """
-        self.logger.info("Generating summary from transcript")
-        
+        return self._run_text_task("summary", transcript)
+
+    async def agenerate_summary(self, transcript: str) -> Dict[str, Any]:
+        """Async variant of generate_summary."""
+        return await self._arun_text_task("summary", transcript)
+
+    async def analyze_all(self, transcript: str) -> Dict[str, Dict[str, Any]]:
+        """Run the analysis, requirements, recommendations and summary calls concurrently.
+
+        Wall-clock time is roughly that of the slowest call rather than the
+        sum of all four.
+
+        Args:
+            transcript: The conversation transcript text
+
+        Returns:
+            Dictionary with "analysis", "requirements", "recommendations" and
+            "summary" results, each shaped like the matching single-call method
+        """
+        analysis, requirements, recommendations, summary = await asyncio.gather(
+            self.aanalyze_transcript(transcript),
+            self.aextract_requirements(transcript),
+            self.agenerate_recommendations(transcript),
+            self.agenerate_summary(transcript)
+        )
+
+        return {
+            "analysis": analysis,
+            "requirements": requirements,
+            "recommendations": recommendations,
+            "summary": summary
+        }
+
+    async def aanalyze_transcripts(self, transcripts: List[str]) -> List[Dict[str, Any]]:
+        """Analyze several transcripts concurrently in real time.
+
+        In-flight requests are capped by azure_openai.max_concurrent_requests.
+
+        Args:
+            transcripts: Conversation transcript texts
+
+        Returns:
+            Analysis results in the same order as the transcripts
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+
+        async def analyze(transcript: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.aanalyze_transcript(transcript)
+
+        return await asyncio.gather(*(analyze(transcript) for transcript in transcripts))
+
+    def analyze_transcripts_batch(
+        self,
+        transcripts: List[str],
+        poll_interval: float = 30.0,
+        timeout: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """Analyze transcripts offline through the Azure OpenAI Batch API.
+
+        All requests go up in a single JSONL file and run as one batch job,
+        which is billed at the discounted batch rate but may take up to the
+        24h completion window. Use aanalyze_transcripts when results are
+        needed immediately.
+
+        Args:
+            transcripts: Conversation transcript texts
+            poll_interval: Seconds between job status checks
+            timeout: Maximum seconds to wait for the job (None waits for the window)
+
+        Returns:
+            Analysis results in the same order as the transcripts
+        """
+        if not transcripts:
+            return []
+
+        client = self._get_batch_client(self.config)
+        deployment = self.batch_deployment_name
+
+        lines = []
+        for idx, transcript in enumerate(transcripts):
+            kwargs = self._analysis_kwargs(transcript)
+            lines.append(orjson.dumps({
+                "custom_id": f"t{idx}",
+                "method": "POST",
+                "url": "/chat/completions",
+                "body": {
+                    "model": deployment,
+                    "messages": kwargs["messages"],
+                    "temperature": kwargs["temperature"],
+                    "max_tokens": kwargs["max_tokens"],
+                    "response_format": kwargs["response_format"]
+                }
+            }))
+
+        self.logger.info("Submitting batch analysis job for %s transcripts", len(transcripts))
+
         try:
-            system_prompt = self.config.get_prompt('system_prompt')
-            summary_prompt = self.config.get_prompt('summary_prompt')
-            
-            user_prompt = summary_prompt.format(transcript=transcript)
-            
-            deployment_name = self.config.get('azure_openai.deployment_name')
-            model = f"azure/{deployment_name}"
-            
-            response = litellm.completion(
-                model=model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.5,
-                max_tokens=1000
+            batch_file = client.files.create(
+                file=("transcript_analysis.jsonl", b"\n".join(lines)),
+                purpose="batch"
             )
-            
+            batch = client.batches.create(
+                input_file_id=batch_file.id,
+                endpoint="/chat/completions",
+                completion_window="24h"
+            )
+
+            started = time.monotonic()
+            while batch.status not in BATCH_TERMINAL_STATUSES:
+                if timeout is not None and time.monotonic() - started > timeout:
+                    raise TimeoutError(f"Batch {batch.id} still {batch.status} after {timeout}s")
+                time.sleep(poll_interval)
+                batch = client.batches.retrieve(batch.id)
+
+            if batch.status != "completed" or not batch.output_file_id:
+                raise RuntimeError(f"Batch {batch.id} ended with status {batch.status}")
+
+            output = client.files.content(batch.output_file_id).text
+        except Exception as e:
+            self.logger.error("Error during batch transcript analysis: %s", e)
+            return [self._get_error_response(str(e)) for _ in transcripts]
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(transcripts)
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            try:
+                record = orjson.loads(line)
+                idx = int(record["custom_id"][1:])
+                if not 0 <= idx < len(results):
+                    raise ValueError(f"custom_id {record['custom_id']} out of range")
+            except Exception as e:
+                # Entries left unfilled are reported as missing below
+                self.logger.error("Skipping unreadable batch output line: %s", e)
+                continue
+            response = record.get("response") or {}
+            try:
+                if response.get("status_code") != 200:
+                    raise ValueError(record.get("error") or f"status {response.get('status_code')}")
+                content = response["body"]["choices"][0]["message"]["content"]
+                results[idx] = self._parse_analysis(content)
+            except orjson.JSONDecodeError as e:
+                self.logger.error("Failed to parse batch response %s as JSON: %s", idx, e)
+                results[idx] = self._get_error_response("Failed to parse analysis results")
+            except Exception as e:
+                self.logger.error("Batch request %s failed: %s", idx, e)
+                results[idx] = self._get_error_response(str(e))
+
+        self.logger.info("Batch transcript analysis completed")
+        return [
+            result if result is not None else self._get_error_response("No result returned by batch job")
+            for result in results
+        ]
+
+    @classmethod
+    def _get_batch_client(cls, config) -> AzureOpenAI:
+        """Get the shared Azure OpenAI client for Batch API jobs, creating it on first use.
+
+        Args:
+            config: Configuration loader
+
+        Returns:
+            AzureOpenAI client
+        """
+        with cls._batch_client_lock:
+            if cls._batch_client is None:
+                cls._batch_client = AzureOpenAI(
+                    api_key=config.get('azure_openai.api_key'),
+                    azure_endpoint=config.get('azure_openai.endpoint'),
+                    api_version=config.get('azure_openai.batch_api_version', '2024-10-21'),
+                    http_client=get_http_client()
+                )
+            return cls._batch_client
+
+    def _log_chunking(self, transcript: str):
+        """Log chunking stats for long transcripts.
+
+        The stats only feed this log line, so chunking is skipped entirely
+        when INFO is filtered out.
+        """
+        if len(transcript) > 5000 and self.logger.isEnabledFor(logging.INFO):
+            self.logger.info("Transcript is long (%s chars), demonstrating chunking...", len(transcript))
+            chunks = self.chunker.chunk_text_recursive(transcript)
+            stats = self.chunker.get_chunk_stats(chunks)
+            self.logger.info("📊 Chunking Stats: %s chunks, avg size: %s chars",
+                             stats['total_chunks'], stats['avg_chunk_size'])
+
+    def _analysis_kwargs(self, transcript: str) -> Dict[str, Any]:
+        """Build the LiteLLM request arguments for the full JSON analysis."""
+        return {
+            "model": self.model,
+            "messages": self._build_messages(self.analysis_prompt, transcript),
+            "api_key": self.api_key,
+            "api_base": self.api_base,
+            "api_version": self.api_version,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            "response_format": {"type": "json_object"},
+            "num_retries": self.num_retries
+        }
+
+    def _run_text_task(self, task: str, transcript: str) -> Dict[str, Any]:
+        """Run one of the TEXT_TASKS and wrap the reply under its result key.
+
+        Args:
+            task: Key in TEXT_TASKS ("requirements", "recommendations" or "summary")
+            transcript: The conversation transcript text
+
+        Returns:
+            {task: content} on success, {"error": message} on failure
+        """
+        self.logger.info("Generating %s from transcript", task)
+
+        cache_key = self._response_cache_key(task, transcript)
+        cached = self._cached_response(cache_key)
+        if cached is not None:
+            return cached
+
+        try:
+            self._check_text_task_context(task, transcript)
+            response = litellm.completion(**self._text_task_kwargs(task, transcript))
             content = response.choices[0].message.content
-            
-            self.logger.info("Summary generation completed")
-            return {"summary": content}
-            
+
+            self.logger.info("Generation of %s completed", task)
+            return self._store_response(cache_key, {task: content})
+
+        except Exception as e:
+            self.logger.error("Error generating %s: %s", task, e)
+            return {"error": str(e)}
+
+    async def _arun_text_task(self, task: str, transcript: str) -> Dict[str, Any]:
+        """Async variant of _run_text_task."""
+        self.logger.info("Generating %s from transcript (async)", task)
+
+        cache_key = self._response_cache_key(task, transcript)
+        cached = self._cached_response(cache_key)
+        if cached is not None:
+            return cached
+
+        try:
+            self._check_text_task_context(task, transcript)
+            response = await litellm.acompletion(**self._text_task_kwargs(task, transcript))
+            content = response.choices[0].message.content
+
+            self.logger.info("Generation of %s completed", task)
+            return self._store_response(cache_key, {task: content})
+
         except Exception as e:
-            self.logger.error(f"Error generating summary: {e}")
+            self.logger.error("Error generating %s: %s", task, e)
             return {"error": str(e)}
+
+    def _text_task_kwargs(self, task: str, transcript: str) -> Dict[str, Any]:
+        """Build the LiteLLM request arguments for a plain-text task.
+
+        Args:
+            task: Key in TEXT_TASKS
+            transcript: The conversation transcript text
+
+        Returns:
+            Keyword arguments for litellm.completion / litellm.acompletion
+        """
+        prompt_attr, temperature, max_tokens = TEXT_TASKS[task]
+        return {
+            "model": self.model,
+            "messages": self._build_messages(getattr(self, prompt_attr), transcript),
+            "api_key": self.api_key,
+            "api_base": self.api_base,
+            "api_version": self.api_version,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "num_retries": self.num_retries
+        }
+
+    def _check_text_task_context(self, task: str, transcript: str):
+        """Check that a TEXT_TASKS request fits in the context window."""
+        prompt_attr, _, max_tokens = TEXT_TASKS[task]
+        self._check_context_window(getattr(self, prompt_attr), transcript, max_tokens)
+
+    def _check_context_window(
+        self,
+        prompt_parts: Tuple[List[Dict[str, str]], List[Dict[str, str]]],
+        transcript: str,
+        max_tokens: int
+    ):
+        """Fail fast when a request cannot fit in the model's context window.
+
+        Tokens are only counted when the text is long enough to possibly
+        overflow: a token covers at least one UTF-8 byte and a character
+        takes at most four, so short inputs are accepted without encoding.
+
+        Args:
+            prompt_parts: Prebuilt messages before and after the transcript
+            transcript: The conversation transcript text
+            max_tokens: Tokens reserved for the completion
+
+        Raises:
+            ValueError: If prompt plus completion tokens exceed the context window
+        """
+        leading, trailing = prompt_parts
+        texts = [message["content"] for message in leading]
+        texts.append(transcript)
+        texts.extend(message["content"] for message in trailing)
+
+        budget = self.context_window - max_tokens - MESSAGE_TOKEN_OVERHEAD * len(texts)
+        if 4 * sum(map(len, texts)) <= budget:
+            return
+
+        encoding = _get_encoding(self.model_name)
+        prompt_tokens = sum(len(encoding.encode(text, disallowed_special=())) for text in texts)
+        if prompt_tokens > budget:
+            raise ValueError(
+                f"Transcript too long: {prompt_tokens} prompt tokens plus {max_tokens} "
+                f"completion tokens exceed the {self.context_window}-token context window"
+            )
+
+    @staticmethod
+    def _build_messages(
+        prompt_parts: Tuple[List[Dict[str, str]], List[Dict[str, str]]],
+        transcript: str
+    ) -> List[Dict[str, str]]:
+        """Build chat messages with the transcript as its own user message.
+
+        Args:
+            prompt_parts: Prebuilt messages before and after the transcript
+            transcript: The conversation transcript text
+
+        Returns:
+            System message, prompt text and transcript messages in order
+        """
+        leading, trailing = prompt_parts
+        return [*leading, {"role": "user", "content": transcript}, *trailing]
+
+    @staticmethod
+    def _append_delta(parts: List[str], chunk: Any):
+        """Collect a streamed content delta, failing fast if the reply is not JSON.
+
+        Args:
+            parts: Content received so far (appended to in place)
+            chunk: Streaming chunk from LiteLLM
+
+        Raises:
+            orjson.JSONDecodeError: If the first visible character cannot start
+                a JSON object or a fenced JSON block
+        """
+        if not chunk.choices:
+            return
+        delta = chunk.choices[0].delta.content
+        if not delta:
+            return
+
+        if not any(part.strip() for part in parts):
+            head = delta.lstrip()
+            if head and head[0] not in "{`":
+                raise orjson.JSONDecodeError("Response is not a JSON object", delta, 0)
+        parts.append(delta)
+
+    def _parse_analysis(self, content: str) -> Dict[str, Any]:
+        """Parse the JSON analysis returned by the model.
+
+        Args:
+            content: Raw response content
+
+        Returns:
+            Parsed analysis dictionary
+
+        Raises:
+            orjson.JSONDecodeError: If the content is not valid JSON
+        """
+        self.logger.info("LiteLLM Response: %.200s...", content)
+
+        # Clean response - remove markdown code blocks if present
+        analysis_result = orjson.loads(_FENCE_RE.match(content).group(1))
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info("Parsed result keys: %s", list(analysis_result))
+
+        self.logger.info("Transcript analysis completed successfully")
+        return analysis_result
     
+    def _response_cache_key(self, task: str, transcript: str) -> Optional[str]:
+        """Build the response cache key for a task, or None if caching is disabled."""
+        if self.response_cache is None:
+            return None
+        return hash_key(task, transcript)
+
+    def _cached_response(self, cache_key: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Get a copy of a cached result so callers can modify it freely."""
+        if cache_key is None:
+            return None
+        cached = self.response_cache.get(cache_key)
+        if cached is None:
+            return None
+        self.logger.info("LLM response cache hit")
+        return dict(cached)
+
+    def _store_response(self, cache_key: Optional[str], result: Dict[str, Any]) -> Dict[str, Any]:
+        """Cache a successful result and return it."""
+        if cache_key is not None:
+            self.response_cache.set(cache_key, dict(result))
+        return result
+
     def _get_error_response(self, error_message: str) -> Dict[str, Any]:
         """Generate error response structure.
         
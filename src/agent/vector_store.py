@@ -1,7 +1,12 @@
 """Milvus vector store for storing and retrieving transcripts."""
+import asyncio
 import json
+import threading
+import time
 import litellm
-from typing import List, Dict, Any, Optional
+import numpy as np
+import orjson
+from typing import List, Dict, Any, Optional, Tuple
 from pymilvus import (
     connections,
     Collection,
@@ -12,7 +17,96 @@ from pymilvus import (
 )
 from src.utils.config_loader import get_config
 from src.utils.logger import setup_logger
-from src.utils.text_chunker import TextChunker
+from src.utils.http_client import configure_litellm_clients
+from src.utils.text_chunker import get_text_chunker
+from src.utils.cache import LRUCache, hash_key
+
+# Fields returned by transcript searches and lookups
+OUTPUT_FIELDS = ["transcript_id", "transcript_text", "analysis_result", "source_type", "timestamp"]
+
+# Fields needed when only the pre-rendered context is used
+SNIPPET_OUTPUT_FIELDS = ["transcript_id", "source_type", "timestamp", "context_snippet"]
+
+# Characters of transcript text kept in a pre-rendered context snippet
+CONTEXT_TRANSCRIPT_CHARS = 2000
+
+# Upper bound on snippet length (VARCHAR max_length is in bytes, up to 4 per char)
+CONTEXT_SNIPPET_MAX_CHARS = 16000
+
+
+def build_context_snippet(transcript_text: str, analysis: Dict[str, Any]) -> str:
+    """Render a transcript and its analysis as compact LLM context.
+
+    Computed once at ingest time and stored alongside the transcript, so
+    retrieval-augmented prompts can use it without re-parsing the analysis.
+
+    Args:
+        transcript_text: The transcript text
+        analysis: Analysis result dictionary
+
+    Returns:
+        Context text for the transcript
+    """
+    parts = []
+    if len(transcript_text) > CONTEXT_TRANSCRIPT_CHARS:
+        parts.append(f"Transcript: {transcript_text[:CONTEXT_TRANSCRIPT_CHARS]}...")
+    else:
+        parts.append(f"Transcript: {transcript_text}")
+
+    if analysis:
+        summary = analysis.get('summary')
+        if isinstance(summary, dict):
+            parts.append(f"Summary: {summary.get('overview', '')}")
+            if summary.get('sentiment'):
+                parts.append(f"Sentiment: {summary['sentiment']}")
+        if 'requirements' in analysis:
+            parts.append(f"Requirements: {json.dumps(analysis['requirements'][:3])}")
+        if 'key_points' in analysis:
+            parts.append(f"Key Points: {json.dumps(analysis['key_points'][:5])}")
+        if 'action_items' in analysis:
+            parts.append(f"Action Items: {json.dumps(analysis['action_items'][:3])}")
+        if 'recommendations' in analysis:
+            parts.append(f"Recommendations: {json.dumps(analysis['recommendations'][:2])}")
+
+    return "\n".join(parts)[:CONTEXT_SNIPPET_MAX_CHARS]
+
+
+# Characters of text embedded in one piece (8192 tokens ≈ 6000 words ≈ 30000 chars;
+# 20000 stays safely under the token limit). Longer texts are chunked and pooled.
+EMBEDDING_MAX_CHARS = 20000
+
+
+def _quote(value: str) -> str:
+    """Render a string as a Milvus expression literal, escaping quotes."""
+    escaped = value.replace('\\', '\\\\').replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def normalize_embedding(embedding: List[float]) -> np.ndarray:
+    """Scale an embedding to unit length.
+
+    With unit-norm vectors inner product equals cosine similarity, so IP
+    indexes rank results the same way the embedding model was trained.
+
+    Args:
+        embedding: Raw embedding vector
+
+    Returns:
+        New float32 unit vector; the input is never modified
+    """
+    vector = np.asarray(embedding, dtype=np.float32)
+    return vector / (np.linalg.norm(vector) + 1e-12)
+
+
+# HNSW search-time ef by collection size: (max entities, ef)
+HNSW_EF_TIERS = (
+    (100_000, 64),
+    (1_000_000, 100),
+    (None, 200)
+)
+
+# Lower bound on HNSW ef per requested result; ef == top_k alone gives poor recall
+HNSW_EF_PER_RESULT = 4
 
 
 class MilvusVectorStore:
@@ -28,17 +122,51 @@ class MilvusVectorStore:
         self.api_base = self.config.get('azure_openai.endpoint')
         self.api_version = self.config.get('azure_openai.api_version')
         self.embedding_deployment = self.config.get('embeddings.deployment_name', 'text-embedding-ada-002')
+        self.embedding_batch_size = self.config.get('embeddings.batch_size', 16)
+        self.embedding_max_concurrency = self.config.get('embeddings.max_concurrency', 5)
 
-        # Set LiteLLM configuration
-        litellm.api_key = self.api_key
-        litellm.api_base = self.api_base
-        litellm.api_version = self.api_version
+        # Credentials are passed per call; only the shared HTTP clients are global
+        configure_litellm_clients()
 
         self.collection_name = self.config.get('milvus.collection_name', 'test')
         self.dimension = self.config.get('milvus.dimension', 1536)
+        self.metric_type = self.config.get('milvus.metric_type', 'IP')
+        self.index_type = self.config.get('milvus.index_type', 'HNSW')
+
+        # Index tuning, resolved once rather than on each index or search setup
+        self.hnsw_m = self.config.get('milvus.hnsw_m', 24)
+        self.hnsw_ef_construction = self.config.get('milvus.hnsw_ef_construction', 128)
+        self.ef_search = self.config.get('milvus.ef_search')
+        self.sq_type = self.config.get('milvus.sq_type', 'SQ8')
+        self.nlist = self.config.get('milvus.nlist', 128)
+        self.nprobe = self.config.get('milvus.nprobe', 10)
+        self.pq_m = self.config.get('milvus.pq_m', 16)
+        self.pq_nbits = self.config.get('milvus.pq_nbits', 8)
+        self.num_partitions = self.config.get('milvus.num_partitions', 16)
+
+        # Short-lived cache of search results keyed by (query, top_k)
+        self.search_cache = LRUCache(
+            max_size=self.config.get('milvus.search_cache_size', 1024),
+            ttl=self.config.get('milvus.search_cache_ttl_seconds', 60)
+        )
+
+        # Recently fetched transcripts keyed by transcript_id
+        self.transcript_cache = LRUCache(
+            max_size=self.config.get('milvus.lookup_cache_size', 256),
+            ttl=self.config.get('milvus.search_cache_ttl_seconds', 60)
+        )
+
+        # Embeddings of recently seen texts keyed by content hash (exact match)
+        self.embedding_cache = LRUCache(
+            max_size=self.config.get('embeddings.cache_size', 2048),
+            ttl=self.config.get('embeddings.cache_ttl_seconds', 3600)
+        )
 
         # Initialize text chunker
-        self.chunker = TextChunker()
+        self.chunker = get_text_chunker()
+
+        # Set when inserts have not yet been sealed by a flush
+        self._dirty = False
 
         # Connect to Milvus
         self._connect()
@@ -89,8 +217,17 @@ class MilvusVectorStore:
                 self._create_collection()
                 self.logger.info(f"Created new collection: {self.collection_name}")
             
+            # Collections created before context snippets existed lack the field
+            self.has_context_snippet = any(
+                field.name == "context_snippet" for field in self.collection.schema.fields
+            )
+            self.output_fields = OUTPUT_FIELDS + (["context_snippet"] if self.has_context_snippet else [])
+
             # Load collection to memory
             self.collection.load()
+
+            # Search params depend on the index actually built on the collection
+            self.search_params = self._build_search_params()
             
         except Exception as e:
             self.logger.error(f"Failed to setup collection: {e}")
@@ -105,8 +242,10 @@ class MilvusVectorStore:
             FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=self.dimension),
             FieldSchema(name="transcript_text", dtype=DataType.VARCHAR, max_length=65535),
             FieldSchema(name="analysis_result", dtype=DataType.VARCHAR, max_length=65535),
-            FieldSchema(name="source_type", dtype=DataType.VARCHAR, max_length=50),
-            FieldSchema(name="timestamp", dtype=DataType.INT64)
+            # Partition key: searches filtered by source only visit matching partitions
+            FieldSchema(name="source_type", dtype=DataType.VARCHAR, max_length=50, is_partition_key=True),
+            FieldSchema(name="timestamp", dtype=DataType.INT64),
+            FieldSchema(name="context_snippet", dtype=DataType.VARCHAR, max_length=65535)
         ]
         
         schema = CollectionSchema(
@@ -117,52 +256,220 @@ class MilvusVectorStore:
         # Create collection
         self.collection = Collection(
             name=self.collection_name,
-            schema=schema
+            schema=schema,
+            num_partitions=self.num_partitions
         )
         
         # Create index
         index_params = {
-            "metric_type": self.config.get('milvus.metric_type', 'L2'),
-            "index_type": self.config.get('milvus.index_type', 'IVF_FLAT'),
-            "params": {"nlist": self.config.get('milvus.nlist', 128)}
+            "metric_type": self.metric_type,
+            "index_type": self.index_type,
+            "params": self._index_build_params(self.index_type)
         }
         
         self.collection.create_index(
             field_name="embedding",
             index_params=index_params
         )
+
+        # Scalar index so lookups by transcript_id do not scan every segment
+        self.collection.create_index(
+            field_name="transcript_id",
+            index_name="transcript_id_idx",
+            index_params={"index_type": "Trie"}
+        )
+
+    def _index_build_params(self, index_type: str) -> Dict[str, Any]:
+        """Get index build parameters for the given index type.
+
+        Args:
+            index_type: Milvus index type (HNSW, HNSW_SQ, IVF_FLAT, IVF_SQ8, IVF_PQ)
+
+        Returns:
+            Index build parameters
+        """
+        if index_type == 'HNSW':
+            return {"M": self.hnsw_m, "efConstruction": self.hnsw_ef_construction}
+        if index_type == 'HNSW_SQ':
+            # Graph over scalar-quantized vectors (Milvus 2.5+)
+            return {"M": self.hnsw_m, "efConstruction": self.hnsw_ef_construction, "sq_type": self.sq_type}
+        if index_type == 'IVF_PQ':
+            return {"nlist": self.nlist, "m": self.pq_m, "nbits": self.pq_nbits}
+        return {"nlist": self.nlist}
+
+    def _build_search_params(self) -> Dict[str, Any]:
+        """Build search parameters matching the collection's index.
+
+        For HNSW the ef value comes from milvus.ef_search, or is picked from
+        HNSW_EF_TIERS based on the collection size at load time.
+
+        Returns:
+            Search parameters for collection.search
+        """
+        index_type = self.index_type
+        try:
+            if self.collection.indexes:
+                index_params = self.collection.indexes[0].params
+                index_type = index_params.get('index_type', index_type)
+                # Existing collections keep the metric they were indexed with
+                self.metric_type = index_params.get('metric_type', self.metric_type)
+        except Exception as e:
+            self.logger.warning(f"Could not read index info, assuming {index_type}: {e}")
+
+        if index_type.startswith('HNSW'):
+            ef = self.ef_search
+            if ef is None:
+                num_entities = self.collection.num_entities
+                ef = next(tier_ef for limit, tier_ef in HNSW_EF_TIERS if limit is None or num_entities < limit)
+            params = {"ef": ef}
+        else:
+            params = {"nprobe": self.nprobe}
+
+        self.logger.info(f"Search params for {index_type} index: {params}")
+        return {"metric_type": self.metric_type, "params": params}
     
-    def _get_embedding(self, text: str) -> List[float]:
+    def _get_embedding(self, text: str) -> np.ndarray:
         """Generate embedding for text using LiteLLM with Azure OpenAI.
 
         Args:
             text: Text to embed
 
         Returns:
-            Embedding vector
+            Unit-norm embedding vector
+        """
+        return self._get_embeddings([text])[0]
+
+    def _get_embeddings(self, texts: List[str]) -> List[np.ndarray]:
+        """Generate embeddings for several texts, embedding.batch_size texts per request.
+
+        Texts embedded recently are served from the embedding cache; only
+        the misses are sent to Azure OpenAI. Texts over EMBEDDING_MAX_CHARS
+        are chunked and their chunk embeddings mean-pooled.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Unit-norm embedding vectors in the same order as the texts
         """
         try:
-            # Truncate text if too long (8192 tokens ≈ 6000 words ≈ 30000 chars)
-            # Use a safe limit of 20000 characters to avoid token limit
-            max_chars = 20000
-            if len(text) > max_chars:
-                self.logger.warning(f"Text too long ({len(text)} chars), truncating to {max_chars} chars for embedding")
-                text = text[:max_chars]
-
-            response = litellm.embedding(
-                model=f"azure/{self.embedding_deployment}",
-                input=[text],
-                api_key=self.api_key,
-                api_base=self.api_base,
-                api_version=self.api_version
-            )
+            pieces, spans = self._split_for_embedding(texts)
+            embeddings = self._cached_embeddings(pieces)
 
-            return response.data[0]['embedding']
+            for batch in self._missing_batches(embeddings):
+                response = litellm.embedding(**self._embedding_kwargs([pieces[i] for i in batch]))
+                self._fill_embeddings(embeddings, pieces, batch, response)
+            return self._pool_embeddings(pieces, embeddings, spans)
 
         except Exception as e:
             self.logger.error(f"Failed to generate embedding: {e}")
             raise
 
+    async def _aembed_many(self, texts: List[str]) -> List[np.ndarray]:
+        """Async variant of _get_embeddings that sends the batches concurrently.
+
+        At most embeddings.max_concurrency requests are in flight at once.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Unit-norm embedding vectors in the same order as the texts
+        """
+        semaphore = asyncio.Semaphore(self.embedding_max_concurrency)
+
+        async def embed(batch: List[int]):
+            async with semaphore:
+                response = await litellm.aembedding(**self._embedding_kwargs([pieces[i] for i in batch]))
+            self._fill_embeddings(embeddings, pieces, batch, response)
+
+        try:
+            pieces, spans = self._split_for_embedding(texts)
+            embeddings = self._cached_embeddings(pieces)
+
+            await asyncio.gather(*(embed(batch) for batch in self._missing_batches(embeddings)))
+            return self._pool_embeddings(pieces, embeddings, spans)
+
+        except Exception as e:
+            self.logger.error(f"Failed to generate embedding: {e}")
+            raise
+
+    def _split_for_embedding(self, texts: List[str]) -> Tuple[List[str], List[Tuple[int, int]]]:
+        """Chunk texts over the embedding input limit.
+
+        Returns:
+            The flat list of pieces to embed and, per text, the (start, end)
+            range of its pieces in that list
+        """
+        long_indices = [idx for idx, text in enumerate(texts) if len(text) > EMBEDDING_MAX_CHARS]
+        long_chunks = dict(zip(
+            long_indices,
+            self.chunker.chunk_many([texts[idx] for idx in long_indices])
+        ))
+
+        pieces = []
+        spans = []
+        for idx, text in enumerate(texts):
+            start = len(pieces)
+            chunks = long_chunks.get(idx)
+            if chunks is not None:
+                self.logger.info(f"Text too long ({len(text)} chars), embedding {len(chunks)} chunks")
+                pieces.extend(chunks)
+            else:
+                pieces.append(text)
+            spans.append((start, len(pieces)))
+        return pieces, spans
+
+    @staticmethod
+    def _pool_embeddings(
+        pieces: List[str],
+        embeddings: List[np.ndarray],
+        spans: List[Tuple[int, int]]
+    ) -> List[np.ndarray]:
+        """Mean-pool chunk embeddings per text, weighted by chunk length."""
+        pooled = []
+        for start, end in spans:
+            if end - start == 1:
+                pooled.append(embeddings[start])
+                continue
+            weights = np.array([len(piece) for piece in pieces[start:end]], dtype=np.float32)
+            pooled.append(normalize_embedding(weights @ np.vstack(embeddings[start:end])))
+        return pooled
+
+    def _cached_embeddings(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Look up texts in the embedding cache (None marks a miss)."""
+        return [self.embedding_cache.get(hash_key(self.embedding_deployment, text)) for text in texts]
+
+    def _missing_batches(self, embeddings: List[Optional[np.ndarray]]) -> List[List[int]]:
+        """Split the indexes of uncached texts into request batches."""
+        missing = [idx for idx, embedding in enumerate(embeddings) if embedding is None]
+        size = max(1, self.embedding_batch_size)
+        return [missing[i:i + size] for i in range(0, len(missing), size)]
+
+    def _fill_embeddings(
+        self,
+        embeddings: List[Optional[np.ndarray]],
+        texts: List[str],
+        batch: List[int],
+        response: Any
+    ):
+        """Normalize a batch response into the result list and the embedding cache."""
+        for idx, item in zip(batch, response.data):
+            # float32 arrays take ~6 KB per vector instead of ~50 KB as a list of floats
+            embedding = normalize_embedding(item['embedding'])
+            embeddings[idx] = embedding
+            self.embedding_cache.set(hash_key(self.embedding_deployment, texts[idx]), embedding)
+
+    def _embedding_kwargs(self, batch: List[str]) -> Dict[str, Any]:
+        """Build the LiteLLM request arguments for one embedding batch."""
+        return {
+            "model": f"azure/{self.embedding_deployment}",
+            "input": batch,
+            "api_key": self.api_key,
+            "api_base": self.api_base,
+            "api_version": self.api_version
+        }
+
     def chunk_and_display(self, text: str) -> Dict[str, Any]:
         """Chunk text and display statistics (for demonstration).
 
@@ -206,9 +513,11 @@ class MilvusVectorStore:
             # Method 3: Document Chunks with Metadata
             self.logger.info("\n\n📄 Method 3: Document Chunks with Metadata")
             self.logger.info("-" * 80)
+            # Reuses the recursive split from Method 1 instead of splitting again
             doc_chunks = self.chunker.chunk_documents(
                 text,
-                metadata={'source': 'demo', 'type': 'transcript'}
+                metadata={'source': 'demo', 'type': 'transcript'},
+                chunks=recursive_chunks
             )
 
             self.logger.info(f"✓ Total Document Chunks: {len(doc_chunks)}")
@@ -238,38 +547,45 @@ class MilvusVectorStore:
         transcript_id: str,
         transcript_text: str,
         analysis_result: Dict[str, Any],
-        source_type: str = "text"
+        source_type: str = "text",
+        flush: bool = False
     ) -> bool:
         """Store transcript and its analysis in Milvus.
+
+        Inserted rows are searchable without a flush; flushing seals segments
+        and blocks, so it is deferred to flush_pending unless requested.
         
         Args:
             transcript_id: Unique identifier for the transcript
             transcript_text: The transcript text
             analysis_result: Analysis results dictionary
             source_type: Source type (text or audio)
+            flush: Flush the collection right after inserting
             
         Returns:
             True if successful, False otherwise
         """
         try:
-            import time
-            
             # Generate embedding
             embedding = self._get_embedding(transcript_text)
             
             # Prepare data
-            data = [
-                [transcript_id],
-                [embedding],
-                [transcript_text],
-                [json.dumps(analysis_result)],
-                [source_type],
-                [int(time.time())]
-            ]
+            data = self._insert_columns([{
+                "transcript_id": transcript_id,
+                "transcript_text": transcript_text,
+                "analysis_result": analysis_result,
+                "source_type": source_type
+            }], [embedding])
             
             # Insert into collection
             self.collection.insert(data)
-            self.collection.flush()
+            self._dirty = True
+            if flush:
+                self.flush_pending()
+
+            # Cached searches and lookups may now be missing the new transcript
+            self.search_cache.clear()
+            self.transcript_cache.clear()
             
             self.logger.info(f"Stored transcript: {transcript_id}")
             return True
@@ -278,59 +594,235 @@ class MilvusVectorStore:
             self.logger.error(f"Failed to store transcript: {e}")
             return False
     
+    async def store_transcripts_bulk(
+        self,
+        items: List[Dict[str, Any]],
+        batch_size: int = 64,
+        max_concurrency: int = 4
+    ) -> int:
+        """Store many transcripts with batched embeddings and concurrent inserts.
+
+        Each batch is embedded (sub-batched per embeddings.batch_size) and
+        inserted as one columnar payload; up to max_concurrency batches run at
+        once and the collection is flushed a single time at the end.
+
+        Args:
+            items: Dicts with transcript_id, transcript_text, analysis_result
+                and optional source_type (defaults to "text")
+            batch_size: Transcripts per insert
+            max_concurrency: Batches processed concurrently
+
+        Returns:
+            Number of transcripts stored
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def store_batch(batch: List[Dict[str, Any]]) -> int:
+            async with semaphore:
+                try:
+                    embeddings = await self._aembed_many([item['transcript_text'] for item in batch])
+                    data = self._insert_columns(batch, embeddings)
+                    await asyncio.to_thread(self.collection.insert, data)
+                    self._dirty = True
+                    return len(batch)
+                except Exception as e:
+                    self.logger.error(f"Failed to store batch of {len(batch)} transcripts: {e}")
+                    return 0
+
+        size = max(1, batch_size)
+        batches = [items[i:i + size] for i in range(0, len(items), size)]
+        stored = sum(await asyncio.gather(*(store_batch(batch) for batch in batches)))
+
+        if stored:
+            await asyncio.to_thread(self.flush_pending)
+            self.search_cache.clear()
+            self.transcript_cache.clear()
+
+        self.logger.info(f"Stored {stored}/{len(items)} transcripts in bulk")
+        return stored
+
+    def _insert_columns(
+        self,
+        items: List[Dict[str, Any]],
+        embeddings: List[np.ndarray]
+    ) -> List[List[Any]]:
+        """Build the column-ordered insert payload for a batch of transcripts.
+
+        Embeddings go in as one contiguous float32 matrix rather than nested
+        lists of Python floats.
+        """
+        timestamp = int(time.time())
+        data = [
+            [item['transcript_id'] for item in items],
+            np.asarray(embeddings, dtype=np.float32),
+            [item['transcript_text'] for item in items],
+            [orjson.dumps(item['analysis_result']).decode() for item in items],
+            [item.get('source_type', 'text') for item in items],
+            [timestamp] * len(items)
+        ]
+        if self.has_context_snippet:
+            data.append([
+                build_context_snippet(item['transcript_text'], item['analysis_result'])
+                for item in items
+            ])
+        return data
+    
     def search_similar_transcripts(
         self,
         query_text: str,
-        top_k: int = 5
+        top_k: int = 5,
+        snippets_only: bool = False,
+        source_type: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """Search for similar transcripts.
         
         Args:
             query_text: Query text to search for
             top_k: Number of results to return
+            snippets_only: Return only the pre-rendered context snippet instead of
+                the full transcript and analysis (ignored for collections without
+                snippets)
+            source_type: Only return transcripts from this source (text or audio)
             
         Returns:
             List of similar transcripts with their analysis
         """
+        return self.search_similar_batch([query_text], top_k, snippets_only, source_type)[0]
+
+    def search_similar_batch(
+        self,
+        query_texts: List[str],
+        top_k: int = 5,
+        snippets_only: bool = False,
+        source_type: Optional[str] = None,
+        raw_analysis: bool = False
+    ) -> List[List[Dict[str, Any]]]:
+        """Search for transcripts similar to each of several queries at once.
+
+        Uncached queries are embedded together and sent to Milvus as a single
+        multi-vector search, so N queries cost one round trip instead of N.
+
+        Args:
+            query_texts: Query texts to search for
+            top_k: Number of results to return per query
+            snippets_only: See search_similar_transcripts
+            source_type: Only return transcripts from this source (text or audio)
+            raw_analysis: Return each analysis_result as an orjson.Fragment of the
+                stored JSON instead of a parsed dict, for callers that only
+                serialize it again
+
+        Returns:
+            One result list per query, in the same order as the queries
+        """
+        snippets_only = snippets_only and self.has_context_snippet
+        cache_keys = [(query_text, top_k, snippets_only, source_type, raw_analysis) for query_text in query_texts]
+        batch_results: List[Optional[List[Dict[str, Any]]]] = []
+        for cache_key in cache_keys:
+            cached = self.search_cache.get(cache_key)
+            batch_results.append(list(cached) if cached is not None else None)
+
+        missing = [idx for idx, results in enumerate(batch_results) if results is None]
+        if len(missing) < len(query_texts):
+            self.logger.info(f"Search cache hit for {len(query_texts) - len(missing)}/{len(query_texts)} queries")
+        if not missing:
+            return batch_results
+
         try:
-            # Generate query embedding
-            query_embedding = self._get_embedding(query_text)
+            # Generate query embeddings
+            query_embeddings = self._get_embeddings([query_texts[idx] for idx in missing])
             
-            # Search parameters
-            search_params = {
-                "metric_type": self.config.get('milvus.metric_type', 'L2'),
-                "params": {"nprobe": 10}
-            }
+            # Search parameters (HNSW requires ef >= top_k; keep a margin for recall)
+            search_params = self.search_params
+            min_ef = top_k * HNSW_EF_PER_RESULT
+            if "ef" in search_params["params"] and search_params["params"]["ef"] < min_ef:
+                search_params = {
+                    "metric_type": self.metric_type,
+                    "params": {"ef": min_ef}
+                }
             
             # Perform search
             results = self.collection.search(
-                data=[query_embedding],
+                data=query_embeddings,
                 anns_field="embedding",
                 param=search_params,
                 limit=top_k,
-                output_fields=["transcript_id", "transcript_text", "analysis_result", "source_type", "timestamp"]
+                expr=f"source_type == {_quote(source_type)}" if source_type else None,
+                output_fields=SNIPPET_OUTPUT_FIELDS if snippets_only else self.output_fields
             )
             
-            # Format results
-            formatted_results = []
-            for hits in results:
-                for hit in hits:
-                    formatted_results.append({
-                        "transcript_id": hit.entity.get("transcript_id"),
-                        "transcript_text": hit.entity.get("transcript_text"),
-                        "analysis_result": json.loads(hit.entity.get("analysis_result")),
-                        "source_type": hit.entity.get("source_type"),
-                        "timestamp": hit.entity.get("timestamp"),
-                        "distance": hit.distance
-                    })
-            
-            self.logger.info(f"Found {len(formatted_results)} similar transcripts")
-            return formatted_results
+            # Format results (one hit list per query vector)
+            for idx, hits in zip(missing, results):
+                formatted_results = [self._format_hit(hit, snippets_only, raw_analysis) for hit in hits]
+                self.search_cache.set(cache_keys[idx], formatted_results)
+                batch_results[idx] = list(formatted_results)
+
+            self.logger.info(f"Searched {len(missing)} queries, {sum(len(batch_results[idx]) for idx in missing)} similar transcripts found")
             
         except Exception as e:
             self.logger.error(f"Failed to search transcripts: {e}")
-            return []
+            for idx in missing:
+                batch_results[idx] = []
+
+        return batch_results
     
+    def warmup(self):
+        """Run one uncached embedding and search so the first real query pays no setup cost.
+
+        Opens the connection to the embedding deployment and has Milvus load
+        the HNSW index segments before traffic arrives.
+        """
+        embedding = self._get_embeddings(["warmup"])[0]
+        self.collection.search(
+            data=[embedding],
+            anns_field="embedding",
+            param=self.search_params,
+            limit=1,
+            output_fields=["id"]
+        )
+
+    def find_similar_analysis(self, transcript_text: str, min_similarity: float) -> Optional[Dict[str, Any]]:
+        """Find a stored transcript that is a near duplicate of the given text.
+
+        Used as a semantic cache: a close enough match lets the caller reuse
+        the stored analysis instead of calling the LLM. The query embedding
+        is cached, so storing the transcript afterwards does not embed it again.
+
+        Args:
+            transcript_text: Transcript to look up
+            min_similarity: Minimum cosine similarity for a match (0-1)
+
+        Returns:
+            The closest stored transcript with a "similarity" key, or None
+        """
+        results = self.search_similar_transcripts(transcript_text, top_k=1)
+        if not results:
+            return None
+
+        match = dict(results[0])
+        # Vectors are unit length, so Milvus' squared L2 distance is 2 - 2 * cosine
+        distance = match["distance"]
+        match["similarity"] = distance if self.metric_type == "IP" else 1 - distance / 2
+        if match["similarity"] < min_similarity:
+            return None
+        return match
+
+    def _format_hit(self, hit: Any, snippets_only: bool, raw_analysis: bool = False) -> Dict[str, Any]:
+        """Convert a search hit into a result dictionary."""
+        # Bind the lookup once; hit.entity is a property in pymilvus
+        get = hit.entity.get
+        result = {
+            "transcript_id": get("transcript_id"),
+            "source_type": get("source_type"),
+            "timestamp": get("timestamp"),
+            "distance": hit.distance,
+            "context_snippet": get("context_snippet") if self.has_context_snippet else None
+        }
+        if not snippets_only:
+            result["transcript_text"] = get("transcript_text")
+            analysis = get("analysis_result")
+            result["analysis_result"] = orjson.Fragment(analysis) if raw_analysis else orjson.loads(analysis)
+        return result
+
     def get_transcript_by_id(self, transcript_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve transcript by ID.
         
@@ -340,21 +832,30 @@ class MilvusVectorStore:
         Returns:
             Transcript data or None if not found
         """
+        cached = self.transcript_cache.get(transcript_id)
+        if cached is not None:
+            return dict(cached)
+
         try:
+            # Quote the ID so it cannot break out of the string literal
             results = self.collection.query(
-                expr=f'transcript_id == "{transcript_id}"',
-                output_fields=["transcript_id", "transcript_text", "analysis_result", "source_type", "timestamp"]
+                expr=f"transcript_id == {_quote(transcript_id)}",
+                output_fields=OUTPUT_FIELDS,
+                limit=1,
+                consistency_level="Bounded"
             )
             
             if results:
                 result = results[0]
-                return {
+                transcript = {
                     "transcript_id": result.get("transcript_id"),
                     "transcript_text": result.get("transcript_text"),
-                    "analysis_result": json.loads(result.get("analysis_result")),
+                    "analysis_result": orjson.loads(result.get("analysis_result")),
                     "source_type": result.get("source_type"),
                     "timestamp": result.get("timestamp")
                 }
+                self.transcript_cache.set(transcript_id, transcript)
+                return dict(transcript)
             
             return None
             
@@ -362,6 +863,17 @@ class MilvusVectorStore:
             self.logger.error(f"Failed to retrieve transcript: {e}")
             return None
     
+    def flush_pending(self):
+        """Flush the collection if there are unflushed inserts."""
+        if not self._dirty:
+            return
+        try:
+            self.collection.flush()
+            self._dirty = False
+            self.logger.info("Flushed pending inserts")
+        except Exception as e:
+            self.logger.error(f"Failed to flush collection: {e}")
+
     def disconnect(self):
         """Disconnect from Milvus."""
         try:
@@ -370,3 +882,140 @@ class MilvusVectorStore:
         except Exception as e:
             self.logger.error(f"Error disconnecting from Milvus: {e}")
 
+
+class SearchBatcher:
+    """Coalesce concurrent searches into batched embedding and Milvus calls.
+
+    Searches that arrive within max_wait_seconds of each other (up to
+    max_batch_size) are grouped by filter, run as one search_similar_batch
+    call in a worker thread, and each caller gets its own slice. Call start()
+    from the running event loop before use and stop() at shutdown.
+    """
+
+    def __init__(
+        self,
+        vector_store: MilvusVectorStore,
+        max_batch_size: int = 32,
+        max_wait_seconds: float = 0.005,
+        raw_analysis: bool = False
+    ):
+        """Initialize the batcher.
+
+        Args:
+            vector_store: Vector store the searches run against
+            max_batch_size: Maximum number of searches per batch
+            max_wait_seconds: How long the first search in a batch waits for company
+            raw_analysis: See MilvusVectorStore.search_similar_batch
+        """
+        self.vector_store = vector_store
+        self.raw_analysis = raw_analysis
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_seconds = max_wait_seconds
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # Batches still running; the worker keeps collecting while they do
+        self._running: set = set()
+
+    def start(self):
+        """Start the batching worker on the running event loop."""
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the batching worker."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def search(
+        self,
+        query_text: str,
+        top_k: int = 5,
+        source_type: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Queue a search and wait for its results.
+
+        Args:
+            query_text: Query text to search for
+            top_k: Number of results to return
+            source_type: Only return transcripts from this source (text or audio)
+
+        Returns:
+            List of similar transcripts with their analysis
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((query_text, top_k, source_type, future))
+        return await future
+
+    async def _run(self):
+        """Collect queued searches into batches and run them."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait_seconds
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Searches with different filters cannot share one Milvus request
+            groups: Dict[Optional[str], List[tuple]] = {}
+            for item in batch:
+                groups.setdefault(item[2], []).append(item)
+
+            for source_type, items in groups.items():
+                task = asyncio.create_task(self._search_group(source_type, items))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+
+    async def _search_group(self, source_type: Optional[str], items: List[tuple]):
+        """Run one batched search and hand each caller its top_k slice."""
+        top_k = max(item[1] for item in items)
+        try:
+            results = await asyncio.to_thread(
+                self.vector_store.search_similar_batch,
+                [item[0] for item in items],
+                top_k,
+                False,
+                source_type,
+                self.raw_analysis
+            )
+        except Exception as e:
+            for item in items:
+                if not item[3].done():
+                    item[3].set_exception(e)
+            return
+
+        for (_, item_top_k, _, future), item_results in zip(items, results):
+            if not future.done():
+                future.set_result(item_results[:item_top_k])
+
+
+# Global vector store instance (one Milvus connection per process)
+_vector_store_instance = None
+_vector_store_lock = threading.Lock()
+
+
+def get_vector_store() -> MilvusVectorStore:
+    """Get global vector store instance.
+
+    The instance is created on first use. If creation fails the error is
+    raised and the next call tries again.
+
+    Returns:
+        MilvusVectorStore instance
+    """
+    global _vector_store_instance
+    if _vector_store_instance is None:
+        with _vector_store_lock:
+            if _vector_store_instance is None:
+                _vector_store_instance = MilvusVectorStore()
+    return _vector_store_instance
@@ -1,11 +1,21 @@
 """FastAPI application for sales transcript analysis."""
+import asyncio
+import gzip
+import hashlib
+import multiprocessing
 import os
-import uuid
-from pathlib import Path
-from typing import Optional
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException
+import secrets
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+import orjson
+from fastapi import FastAPI, BackgroundTasks, Depends, File, UploadFile, Form, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi.responses import ORJSONResponse, HTMLResponse, Response, StreamingResponse
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from pydantic import BaseModel
 
 from src.api.models import (
     TextAnalysisRequest,
@@ -13,6 +23,7 @@ from src.api.models import (
     SearchRequest,
     SearchResponse,
     SearchResult,
+    SearchResultFormat,
     HealthResponse,
     InputType,
     SalesHelperRequest,
@@ -22,30 +33,173 @@ from src.api.models import (
 )
 from src.agent.transcript_analyzer import TranscriptAnalyzer
 from src.agent.audio_processor import AudioProcessor
-from src.agent.vector_store import MilvusVectorStore
+from src.agent.vector_store import MilvusVectorStore, SearchBatcher, get_vector_store
 from src.agent.sales_helper_agent import SalesHelperAgent
 from src.agent.chat_agent import ChatAgent
 from src.utils.config_loader import get_config
 from src.utils.logger import setup_logger
-from src.utils.document_processor import DocumentProcessor
+from src.utils.document_processor import DocumentProcessor, SUPPORTED_SUFFIXES, file_suffix
+from src.utils.cache import LRUCache
 
 
 # Initialize configuration and logger
 config = get_config()
 logger = setup_logger(__name__)
+APP_VERSION = config.get('fastapi.version', '1.0.0')
+SEMANTIC_CACHE_ENABLED = config.get('llm_cache.semantic_enabled', True)
+SEMANTIC_CACHE_MIN_SIMILARITY = config.get('llm_cache.semantic_min_similarity', 0.97)
+PARSE_WORKERS = config.get('fastapi.parse_workers') or os.cpu_count()
+
+# Text extracted from recently uploaded documents, keyed by a hash of the file bytes
+document_text_cache = LRUCache(
+    max_size=config.get('llm_cache.document_cache_size', 1024),
+    ttl=config.get('llm_cache.ttl_seconds')
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the Milvus connection once at startup and release it at shutdown.
+
+    Search continues to be unavailable (rather than the worker failing to
+    start) if Milvus cannot be reached. The chat and sales helper agents are
+    created here, after the store, so importing this module opens no
+    connections. Also sizes the thread pool that blocking calls (Whisper,
+    Milvus, document parsing) are offloaded to.
+    """
+    # The default pool is min(32, CPUs + 4) threads, too few for calls that mostly wait on the network
+    executor = ThreadPoolExecutor(
+        max_workers=config.get('fastapi.thread_pool_size', 32),
+        thread_name_prefix="api-worker"
+    )
+    asyncio.get_running_loop().set_default_executor(executor)
+
+    # Processes for CPU-bound document parsing, which threads would serialize on
+    # the GIL. Spawned rather than forked: the parent holds gRPC and HTTP state.
+    app.state.parse_pool = ProcessPoolExecutor(
+        max_workers=PARSE_WORKERS,
+        mp_context=multiprocessing.get_context("spawn")
+    )
+
+    app.state.search_batcher = None
+    try:
+        app.state.vector_store = await asyncio.to_thread(get_vector_store)
+        logger.info("Milvus vector store initialized successfully")
+    except Exception as e:
+        app.state.vector_store = None
+        logger.warning(f"Milvus not available: {e}. Search functionality will be disabled.")
+    else:
+        app.state.search_batcher = SearchBatcher(
+            app.state.vector_store,
+            max_batch_size=config.get('milvus.search_batch_size', 32),
+            max_wait_seconds=config.get('milvus.search_batch_wait_ms', 5) / 1000,
+            # /search only re-serializes the stored analysis JSON, so skip parsing it
+            raw_analysis=True
+        )
+        app.state.search_batcher.start()
+
+    # The agents share the store opened above; connect=False keeps them from
+    # retrying (and blocking on) Milvus when it was unavailable
+    app.state.sales_helper_agent = SalesHelperAgent(app.state.vector_store, connect=False)
+    app.state.chat_agent = ChatAgent(app.state.vector_store, connect=False)
+
+    await _warmup(app.state.vector_store)
+
+    # Build the OpenAPI schema now rather than on the first /docs request
+    app.openapi()
+
+    yield
+
+    if app.state.search_batcher is not None:
+        await app.state.search_batcher.stop()
+
+    vector_store = app.state.vector_store
+    if vector_store is not None:
+        # Seal any inserts that have not been flushed yet
+        await asyncio.to_thread(vector_store.flush_pending)
+        vector_store.disconnect()
+    app.state.parse_pool.shutdown(wait=False, cancel_futures=True)
+    executor.shutdown(wait=False)
+
+
+async def _warmup(vector_store: Optional[MilvusVectorStore]):
+    """Pay first-request setup costs (connections, index loading) before serving traffic.
+
+    Failures are logged and ignored; the first real request then pays the cost instead.
+    """
+    warmups = {}
+    if vector_store is not None:
+        warmups["search"] = asyncio.to_thread(vector_store.warmup)
+    # Off by default: the warmup completion is a billed LLM call
+    if config.get('fastapi.warmup_llm', False):
+        warmups["llm"] = transcript_analyzer.awarmup()
+    if not warmups:
+        return
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*warmups.values(), return_exceptions=True)
+    for name, result in zip(warmups, results):
+        if isinstance(result, Exception):
+            logger.warning(f"Warmup of {name} failed: {result}")
+    logger.info(f"Warmup ({', '.join(warmups)}) took {(time.perf_counter() - start) * 1000:.0f} ms")
+
 
 # Create FastAPI app
 app = FastAPI(
     title=config.get('fastapi.title', 'Sales Transcript Analysis API'),
     description=config.get('fastapi.description', 'API for analyzing sales conversations'),
-    version=config.get('fastapi.version', '1.0.0')
+    version=APP_VERSION,
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
-# Add CORS middleware
+class BodySizeLimitMiddleware:
+    """Reject request bodies over a size limit with 413 before they are buffered.
+
+    A declared Content-Length over the limit is refused before any of the
+    body is read; chunked bodies are counted as they arrive.
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        content_length = Headers(scope=scope).get("content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_bytes:
+            response = ORJSONResponse({"detail": "Request body too large"}, status_code=413)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise HTTPException(status_code=413, detail="Request body too large")
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    max_bytes=config.get('fastapi.max_upload_mb', 50) * 1024 * 1024
+)
+
+# Add CORS middleware. The API uses no cookies or auth headers, so credentials
+# stay off: a wildcard origin is then sent as a static header instead of the
+# request's Origin being echoed back on every response.
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
-    allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
@@ -53,28 +207,168 @@ app.add_middleware(
 # Initialize components
 transcript_analyzer = TranscriptAnalyzer()
 audio_processor = AudioProcessor()
-sales_helper_agent = SalesHelperAgent()
-chat_agent = ChatAgent()
 
-# Try to initialize Milvus, but continue without it if it fails
-try:
-    vector_store = MilvusVectorStore()
-    MILVUS_ENABLED = True
-    logger.info("Milvus vector store initialized successfully")
-except Exception as e:
-    vector_store = None
-    MILVUS_ENABLED = False
-    logger.warning(f"Milvus not available: {e}. Search functionality will be disabled.")
 
-# Create temp directory for audio uploads
-TEMP_DIR = Path("temp")
-TEMP_DIR.mkdir(exist_ok=True)
+def _json_response(model: BaseModel) -> ORJSONResponse:
+    """Serialize a server-built response model with orjson.
 
+    The models are built with model_construct from data the server produced
+    itself, and returning a response object skips FastAPI's re-validation
+    against response_model (which still documents the endpoint).
+    """
+    return ORJSONResponse(content=model.model_dump())
 
-@app.get("/", response_class=HTMLResponse)
-async def root():
-    """Root endpoint - Web UI for file upload."""
-    html_content = """
+
+# Keys of each search hit in the response, in SearchResult field order
+SEARCH_RESULT_FIELDS = tuple(SearchResult.model_fields)
+
+
+def _new_id() -> str:
+    """Generate a random transcript ID (128 bits as 32 hex characters)."""
+    return secrets.token_hex(16)
+
+
+def get_store(request: Request) -> Optional[MilvusVectorStore]:
+    """Get the vector store opened at startup (None if Milvus is unavailable)."""
+    return request.app.state.vector_store
+
+
+def get_parse_pool(request: Request) -> ProcessPoolExecutor:
+    """Get the document parsing process pool created at startup."""
+    return request.app.state.parse_pool
+
+
+def get_search_batcher(request: Request) -> Optional[SearchBatcher]:
+    """Get the search batcher started at startup (None if Milvus is unavailable)."""
+    return request.app.state.search_batcher
+
+
+def get_sales_helper_agent(request: Request) -> SalesHelperAgent:
+    """Get the sales helper agent created at startup."""
+    return request.app.state.sales_helper_agent
+
+
+def get_chat_agent(request: Request) -> ChatAgent:
+    """Get the chat agent created at startup."""
+    return request.app.state.chat_agent
+
+
+# Uploads are read in chunks of this size instead of whole
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Formats parsed by pure-Python libraries; large ones go to the process pool
+PROCESS_POOL_SUFFIXES = frozenset({'.pdf', '.docx', '.doc', '.xlsx', '.xls'})
+# Below this size, shipping the bytes to another process costs more than parsing
+PROCESS_POOL_MIN_BYTES = 256 * 1024
+# PDFs with fewer pages are parsed in one process; splitting them costs more than it saves
+PDF_PARALLEL_MIN_PAGES = 8
+
+
+async def _find_cached_analysis(
+    vector_store: Optional[MilvusVectorStore],
+    transcript: str
+) -> Optional[Dict[str, Any]]:
+    """Get the analysis of an identical or near-duplicate transcript, if there is one.
+
+    The exact-match cache is checked first since it needs no embedding call.
+    """
+    cached = transcript_analyzer.get_cached_analysis(transcript)
+    if cached is not None:
+        return cached
+
+    if not SEMANTIC_CACHE_ENABLED or vector_store is None:
+        return None
+
+    match = await asyncio.to_thread(
+        vector_store.find_similar_analysis,
+        transcript,
+        SEMANTIC_CACHE_MIN_SIMILARITY
+    )
+    if match is None:
+        return None
+
+    logger.info(f"Semantic cache hit: reusing analysis of {match['transcript_id']} (similarity {match['similarity']:.3f})")
+    return dict(match["analysis_result"])
+
+
+async def _analyze(vector_store: Optional[MilvusVectorStore], transcript: str) -> Tuple[Dict[str, Any], bool]:
+    """Analyze a transcript, reusing the analysis of an identical or near-duplicate one.
+
+    Returns:
+        (analysis result, whether it came from a cache)
+    """
+    analysis_result = await _find_cached_analysis(vector_store, transcript)
+    if analysis_result is not None:
+        return analysis_result, True
+    return await transcript_analyzer.aanalyze_transcript(transcript), False
+
+
+def _queue_store(
+    background_tasks: BackgroundTasks,
+    vector_store: Optional[MilvusVectorStore],
+    transcript_id: str,
+    transcript: str,
+    analysis_result: Dict[str, Any],
+    source_type: str
+):
+    """Store an analyzed transcript after the response is sent (no-op without Milvus)."""
+    if vector_store is None:
+        return
+    logger.info(f"Queueing transcript {transcript_id} for storage in Milvus database")
+    background_tasks.add_task(
+        vector_store.store_transcript,
+        transcript_id=transcript_id,
+        transcript_text=transcript,
+        analysis_result=analysis_result,
+        source_type=source_type
+    )
+
+
+def _extract_document_text(upload: UploadFile, suffix: str, parse_pool: ProcessPoolExecutor) -> str:
+    """Extract text from an uploaded document, reusing the text of identical uploads.
+
+    Large PDF, Word and Excel files are parsed in the process pool; other
+    files are parsed in the calling thread straight from the spooled upload.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for block in iter(lambda: upload.file.read(UPLOAD_CHUNK_SIZE), b""):
+        digest.update(block)
+    size = upload.file.tell()
+    upload.file.seek(0)
+
+    cache_key = (suffix, digest.digest())
+    text = document_text_cache.get(cache_key)
+    if text is not None:
+        logger.info(f"Document text cache hit for {upload.filename}")
+        return text
+
+    if suffix == '.pdf' and size >= PROCESS_POOL_MIN_BYTES:
+        text = _extract_pdf_text(upload.file.read(), parse_pool)
+    elif suffix in PROCESS_POOL_SUFFIXES and size >= PROCESS_POOL_MIN_BYTES:
+        text = parse_pool.submit(DocumentProcessor.process_file, upload.filename, upload.file.read()).result()
+    else:
+        text = DocumentProcessor.process_file(upload.filename, upload.file)
+    document_text_cache.set(cache_key, text)
+    return text
+
+
+def _extract_pdf_text(content: bytes, parse_pool: ProcessPoolExecutor) -> str:
+    """Extract the text of a PDF, splitting long documents into page ranges across the process pool."""
+    page_count = DocumentProcessor.count_pdf_pages(content)
+    if page_count < PDF_PARALLEL_MIN_PAGES:
+        return parse_pool.submit(DocumentProcessor.extract_text_from_pdf, content).result()
+
+    step = -(-page_count // PARSE_WORKERS)
+    futures = [
+        parse_pool.submit(DocumentProcessor.extract_text_from_pdf_pages, content, start, start + step)
+        for start in range(0, page_count, step)
+    ]
+    return "\n\n".join(part for part in (future.result() for future in futures) if part)
+
+
+# Web UI served at /. Encoded, compressed and hashed once at import so each
+# request only picks the right bytes (or answers 304 when the browser has them).
+ROOT_HTML = """
     <!DOCTYPE html>
     <html lang="en">
     <head>
@@ -665,7 +959,26 @@ Client: That fits our $5,000 budget. What's next?"></textarea>
     </body>
     </html>
     """
-    return HTMLResponse(content=html_content)
+ROOT_HTML_BYTES = ROOT_HTML.encode("utf-8")
+ROOT_HTML_GZIP = gzip.compress(ROOT_HTML_BYTES, 9)
+# Weak validator: the gzip and identity bodies are the same representation
+ROOT_HTML_ETAG = f'W/"{hashlib.blake2b(ROOT_HTML_BYTES, digest_size=8).hexdigest()}"'
+ROOT_HTML_HEADERS = {"Cache-Control": "public, max-age=3600", "ETag": ROOT_HTML_ETAG, "Vary": "Accept-Encoding"}
+
+
+@app.get("/", response_class=HTMLResponse)
+async def root(request: Request):
+    """Root endpoint - Web UI for file upload."""
+    if request.headers.get("if-none-match") == ROOT_HTML_ETAG:
+        return Response(status_code=304, headers=ROOT_HTML_HEADERS)
+
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        return Response(
+            content=ROOT_HTML_GZIP,
+            media_type="text/html",
+            headers={**ROOT_HTML_HEADERS, "Content-Encoding": "gzip"}
+        )
+    return Response(content=ROOT_HTML_BYTES, media_type="text/html", headers=ROOT_HTML_HEADERS)
 
 
 @app.get("/health", response_model=HealthResponse)
@@ -673,7 +986,7 @@ async def health_check():
     """Health check endpoint."""
     return HealthResponse(
         status="healthy",
-        version=config.get('fastapi.version', '1.0.0'),
+        version=APP_VERSION,
         services={
             "api": "running",
             "llm": "configured",
@@ -683,11 +996,21 @@ async def health_check():
 
 
 @app.post("/analyze/text", response_model=AnalysisResponse)
-async def analyze_text_transcript(request: TextAnalysisRequest):
+async def analyze_text_transcript(
+    request: TextAnalysisRequest,
+    background_tasks: BackgroundTasks,
+    vector_store: Optional[MilvusVectorStore] = Depends(get_store)
+):
     """Analyze a text transcript.
+
+    A near-duplicate of an already stored transcript reuses its analysis
+    instead of calling the LLM. Storage happens after the response is sent,
+    so the client does not wait for the embedding and insert.
     
     Args:
         request: Text analysis request containing the transcript
+        background_tasks: Tasks run after the response is sent
+        vector_store: Vector store from app state
         
     Returns:
         Analysis results including requirements, recommendations, and summary
@@ -696,39 +1019,34 @@ async def analyze_text_transcript(request: TextAnalysisRequest):
         logger.info("Received text transcript analysis request")
         
         # Generate transcript ID if not provided
-        transcript_id = request.transcript_id or str(uuid.uuid4())
+        transcript_id = request.transcript_id or _new_id()
         
-        # Analyze transcript
-        analysis_result = transcript_analyzer.analyze_transcript(request.transcript)
+        # Analyze transcript (unless a near-duplicate was analyzed before)
+        analysis_result, cached = await _analyze(vector_store, request.transcript)
         
         # Check for errors in analysis
         if "error" in analysis_result:
-            return AnalysisResponse(
+            return _json_response(AnalysisResponse.model_construct(
                 success=False,
                 transcript_id=transcript_id,
                 transcript=request.transcript,
                 error=analysis_result["error"],
                 source_type=InputType.TEXT
-            )
+            ))
         
         # Store in database if requested
-        if request.store_in_db and MILVUS_ENABLED:
-            logger.info(f"Storing transcript {transcript_id} in Milvus database")
-            vector_store.store_transcript(
-                transcript_id=transcript_id,
-                transcript_text=request.transcript,
-                analysis_result=analysis_result,
-                source_type=InputType.TEXT
-            )
-            logger.info(f"✅ Transcript {transcript_id} stored successfully")
+        if request.store_in_db:
+            _queue_store(background_tasks, vector_store, transcript_id, request.transcript,
+                         analysis_result, InputType.TEXT)
         
-        return AnalysisResponse(
+        return _json_response(AnalysisResponse.model_construct(
             success=True,
             transcript_id=transcript_id,
             transcript=request.transcript,
             analysis=analysis_result,
-            source_type=InputType.TEXT
-        )
+            source_type=InputType.TEXT,
+            cached=cached
+        ))
         
     except Exception as e:
         logger.error(f"Error analyzing text transcript: {e}")
@@ -737,110 +1055,105 @@ async def analyze_text_transcript(request: TextAnalysisRequest):
 
 @app.post("/analyze/audio", response_model=AnalysisResponse)
 async def analyze_audio_transcript(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(..., description="Audio file (mp3, wav, m4a, ogg)"),
     transcript_id: Optional[str] = Form(None),
-    store_in_db: bool = Form(True)
+    store_in_db: bool = Form(True),
+    vector_store: Optional[MilvusVectorStore] = Depends(get_store)
 ):
     """Analyze an audio file transcript.
+
+    A near-duplicate of an already stored transcript reuses its analysis
+    instead of calling the LLM. Storage happens after the response is sent,
+    so the client does not wait for the embedding and insert.
     
     Args:
+        background_tasks: Tasks run after the response is sent
         file: Audio file upload
         transcript_id: Optional unique identifier
         store_in_db: Whether to store in database
+        vector_store: Vector store from app state
         
     Returns:
         Analysis results including requirements, recommendations, and summary
     """
-    temp_file_path = None
-    
     try:
         logger.info(f"Received audio file analysis request: {file.filename}")
         
         # Generate transcript ID if not provided
-        transcript_id = transcript_id or str(uuid.uuid4())
-        
-        # Save uploaded file temporarily
-        file_extension = Path(file.filename).suffix
-        temp_file_path = TEMP_DIR / f"{transcript_id}{file_extension}"
-        
-        with open(temp_file_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
+        transcript_id = transcript_id or _new_id()
         
-        # Transcribe audio
-        logger.info(f"Transcribing audio file: {temp_file_path}")
-        transcript_text = audio_processor.transcribe_audio(str(temp_file_path))
+        # Transcribe straight from the spooled upload; no copy to a temp file
+        logger.info(f"Transcribing audio file: {file.filename}")
+        transcript_text = await asyncio.to_thread(audio_processor.transcribe_stream, file.file, file.filename)
 
         if not transcript_text:
             logger.error("Audio transcription returned empty result")
-            return AnalysisResponse(
+            return _json_response(AnalysisResponse.model_construct(
                 success=False,
                 transcript_id=transcript_id,
                 error="Failed to transcribe audio file",
                 source_type=InputType.AUDIO
-            )
+            ))
 
         logger.info(f"Transcription successful. Length: {len(transcript_text)} chars")
 
-        # Analyze transcript
+        # Analyze transcript (unless a near-duplicate was analyzed before)
         logger.info("Starting transcript analysis")
-        analysis_result = transcript_analyzer.analyze_transcript(transcript_text)
+        analysis_result, cached = await _analyze(vector_store, transcript_text)
         logger.info(f"Analysis completed. Result keys: {list(analysis_result.keys())}")
         
         # Check for errors in analysis
         if "error" in analysis_result:
-            return AnalysisResponse(
+            return _json_response(AnalysisResponse.model_construct(
                 success=False,
                 transcript_id=transcript_id,
                 transcript=transcript_text,
                 error=analysis_result["error"],
                 source_type=InputType.AUDIO
-            )
+            ))
         
         # Store in database if requested
-        if store_in_db and MILVUS_ENABLED:
-            logger.info(f"Storing audio transcript {transcript_id} in Milvus database")
-            vector_store.store_transcript(
-                transcript_id=transcript_id,
-                transcript_text=transcript_text,
-                analysis_result=analysis_result,
-                source_type=InputType.AUDIO
-            )
-            logger.info(f"✅ Audio transcript {transcript_id} stored successfully")
+        if store_in_db:
+            _queue_store(background_tasks, vector_store, transcript_id, transcript_text,
+                         analysis_result, InputType.AUDIO)
         
-        return AnalysisResponse(
+        return _json_response(AnalysisResponse.model_construct(
             success=True,
             transcript_id=transcript_id,
             transcript=transcript_text,
             analysis=analysis_result,
-            source_type=InputType.AUDIO
-        )
+            source_type=InputType.AUDIO,
+            cached=cached
+        ))
         
     except Exception as e:
         logger.error(f"Error analyzing audio transcript: {e}")
         raise HTTPException(status_code=500, detail=str(e))
-    
-    finally:
-        # Clean up temporary file
-        if temp_file_path and temp_file_path.exists():
-            try:
-                os.remove(temp_file_path)
-            except Exception as e:
-                logger.warning(f"Failed to remove temporary file: {e}")
 
 
 @app.post("/analyze/file", response_model=AnalysisResponse)
 async def analyze_file(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(..., description="Document file (PDF, Word, CSV, Excel, TXT)"),
     transcript_id: Optional[str] = Form(None),
-    store_in_db: bool = Form(True)
+    store_in_db: bool = Form(True),
+    vector_store: Optional[MilvusVectorStore] = Depends(get_store),
+    parse_pool: ProcessPoolExecutor = Depends(get_parse_pool)
 ):
     """Analyze a document file (PDF, Word, CSV, Excel, TXT).
 
+    A near-duplicate of an already stored transcript reuses its analysis
+    instead of calling the LLM. Storage happens after the response is sent,
+    so the client does not wait for the embedding and insert.
+
     Args:
+        background_tasks: Tasks run after the response is sent
         file: Document file upload
         transcript_id: Optional unique identifier
         store_in_db: Whether to store in database
+        vector_store: Vector store from app state
+        parse_pool: Process pool for CPU-bound document parsing
 
     Returns:
         Analysis results including requirements, recommendations, and summary
@@ -849,54 +1162,60 @@ async def analyze_file(
         logger.info(f"Received file analysis request: {file.filename}")
 
         # Generate transcript ID if not provided
-        transcript_id = transcript_id or str(uuid.uuid4())
-
-        # Read file content
-        file_content = await file.read()
+        transcript_id = transcript_id or _new_id()
+
+        # Reject unsupported formats before reading any of the upload
+        suffix = file_suffix(file.filename)
+        if suffix not in SUPPORTED_SUFFIXES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported file format: {suffix}. Supported formats: PDF, DOCX, CSV, XLSX, TXT"
+            )
 
-        # Extract text from file
+        # Extract text straight from the spooled upload rather than a full in-memory copy
         try:
-            transcript_text = DocumentProcessor.process_file(file.filename, file_content)
+            transcript_text = await asyncio.to_thread(_extract_document_text, file, suffix, parse_pool)
         except ValueError as e:
             raise HTTPException(status_code=400, detail=str(e))
         except ImportError as e:
             raise HTTPException(status_code=500, detail=f"Missing dependency: {str(e)}")
 
         if not transcript_text or not transcript_text.strip():
-            return AnalysisResponse(
+            return _json_response(AnalysisResponse.model_construct(
                 success=False,
                 transcript_id=transcript_id,
                 error="No text could be extracted from the file",
                 source_type=InputType.TEXT
-            )
+            ))
 
         logger.info(f"Extracted {len(transcript_text)} characters from {file.filename}")
 
-        # Analyze the extracted text
-        analysis_result = transcript_analyzer.analyze_transcript(transcript_text)
+        # Analyze the extracted text (unless a near-duplicate was analyzed before)
+        analysis_result, cached = await _analyze(vector_store, transcript_text)
+
+        # Check for errors in analysis
+        if "error" in analysis_result:
+            return _json_response(AnalysisResponse.model_construct(
+                success=False,
+                transcript_id=transcript_id,
+                transcript=transcript_text,
+                error=analysis_result["error"],
+                source_type=InputType.TEXT
+            ))
 
         # Store in vector database if requested
-        if store_in_db and MILVUS_ENABLED:
-            try:
-                logger.info(f"Storing file transcript {transcript_id} in Milvus database")
-                vector_store.store_transcript(
-                    transcript_id=transcript_id,
-                    transcript_text=transcript_text,
-                    analysis_result=analysis_result,
-                    source_type=f"file_{Path(file.filename).suffix}"
-                )
-                logger.info(f"✅ File transcript {transcript_id} stored successfully")
-            except Exception as e:
-                logger.warning(f"Failed to store in vector database: {e}")
-                analysis_result["storage_warning"] = "Analysis completed but not stored in database"
-
-        return AnalysisResponse(
+        if store_in_db:
+            _queue_store(background_tasks, vector_store, transcript_id, transcript_text,
+                         analysis_result, f"file_{suffix}")
+
+        return _json_response(AnalysisResponse.model_construct(
             success=True,
             transcript_id=transcript_id,
             transcript=transcript_text,
             analysis=analysis_result,
-            source_type=InputType.TEXT
-        )
+            source_type=InputType.TEXT,
+            cached=cached
+        ))
 
     except HTTPException:
         raise
@@ -906,11 +1225,17 @@ async def analyze_file(
 
 
 @app.post("/search", response_model=SearchResponse)
-async def search_transcripts(request: SearchRequest):
+async def search_transcripts(
+    request: SearchRequest,
+    search_batcher: Optional[SearchBatcher] = Depends(get_search_batcher)
+):
     """Search for similar transcripts.
+
+    Concurrent searches are batched into shared embedding and Milvus calls.
     
     Args:
         request: Search request with query text
+        search_batcher: Search batcher from app state
         
     Returns:
         List of similar transcripts
@@ -918,28 +1243,28 @@ async def search_transcripts(request: SearchRequest):
     try:
         logger.info(f"Searching for similar transcripts: {request.query}")
         
-        results = vector_store.search_similar_transcripts(
-            query_text=request.query,
-            top_k=request.top_k
+        results = await search_batcher.search(
+            request.query,
+            top_k=request.top_k,
+            source_type=request.source_type.value if request.source_type else None
         )
         
-        search_results = [
-            SearchResult(
-                transcript_id=r["transcript_id"],
-                transcript_text=r["transcript_text"],
-                analysis_result=r["analysis_result"],
-                source_type=r["source_type"],
-                timestamp=r["timestamp"],
-                distance=r["distance"]
-            )
-            for r in results
-        ]
-        
-        return SearchResponse(
-            success=True,
-            results=search_results,
-            count=len(search_results)
-        )
+        # Hits go out as plain dicts serialized by orjson; building a
+        # SearchResult per hit only to dump it again is pure overhead
+        if request.format is SearchResultFormat.COLUMNS:
+            rows = []
+            columns = {field: [r[field] for r in results] for field in SEARCH_RESULT_FIELDS}
+        else:
+            rows = [{field: r[field] for field in SEARCH_RESULT_FIELDS} for r in results]
+            columns = None
+
+        return ORJSONResponse(content={
+            "success": True,
+            "results": rows,
+            "count": len(results),
+            "columns": columns,
+            "error": None
+        })
         
     except Exception as e:
         logger.error(f"Error searching transcripts: {e}")
@@ -952,20 +1277,24 @@ async def search_transcripts(request: SearchRequest):
 
 
 @app.get("/transcript/{transcript_id}")
-async def get_transcript(transcript_id: str):
+async def get_transcript(
+    transcript_id: str,
+    vector_store: Optional[MilvusVectorStore] = Depends(get_store)
+):
     """Retrieve a transcript by ID.
     
     Args:
         transcript_id: Transcript identifier
+        vector_store: Vector store from app state
         
     Returns:
         Transcript data and analysis
     """
     try:
-        result = vector_store.get_transcript_by_id(transcript_id)
+        result = await asyncio.to_thread(vector_store.get_transcript_by_id, transcript_id)
         
         if result:
-            return JSONResponse(content={
+            return ORJSONResponse(content={
                 "success": True,
                 "data": result
             })
@@ -980,7 +1309,10 @@ async def get_transcript(transcript_id: str):
 
 
 @app.post("/sales-helper", response_model=SalesHelperResponse)
-async def sales_helper(request: SalesHelperRequest):
+async def sales_helper(
+    request: SalesHelperRequest,
+    sales_helper_agent: SalesHelperAgent = Depends(get_sales_helper_agent)
+):
     """Sales helper agent endpoint.
 
     Captures requirements from salesperson, searches database, and provides recommendations.
@@ -994,7 +1326,7 @@ async def sales_helper(request: SalesHelperRequest):
     try:
         logger.info(f"Sales helper request received: {request.salesperson_input[:100]}...")
 
-        result = sales_helper_agent.process_salesperson_input(request.salesperson_input)
+        result = await sales_helper_agent.aprocess_salesperson_input(request.salesperson_input)
 
         return SalesHelperResponse(**result)
 
@@ -1007,7 +1339,7 @@ async def sales_helper(request: SalesHelperRequest):
 
 
 @app.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+async def chat(request: ChatRequest, chat_agent: ChatAgent = Depends(get_chat_agent)):
     """Chat with AI agent about stored transcript data.
 
     Uses LangChain with conversation memory to answer questions based on stored data.
@@ -1021,7 +1353,7 @@ async def chat(request: ChatRequest):
     try:
         logger.info(f"Chat request received: {request.message[:100]}...")
 
-        result = chat_agent.chat(
+        result = await chat_agent.achat(
             user_message=request.message,
             session_id=request.session_id
         )
@@ -1037,8 +1369,50 @@ async def chat(request: ChatRequest):
         )
 
 
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest, chat_agent: ChatAgent = Depends(get_chat_agent)):
+    """Chat with AI agent, streaming the answer as server-sent events.
+
+    Each piece of the answer is a "token" event with data {"text": ...}.
+    The stream ends with a "done" event ({"session_id": ...}) on success,
+    or an "error" event ({"error": ..., "session_id": ...}) if the agent
+    failed; the HTTP status is already 200 by then, so the final event is
+    how callers tell an answer from a failure.
+
+    Args:
+        request: User's chat message and optional session ID
+
+    Returns:
+        Event stream with the agent's answer
+    """
+    logger.info(f"Streaming chat request received: {request.message[:100]}...")
+
+    return StreamingResponse(
+        _chat_events(chat_agent, request.message, request.session_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+
+def _sse(event: str, data: Dict[str, Any]) -> bytes:
+    """Encode one server-sent event with a JSON data payload."""
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+async def _chat_events(chat_agent: ChatAgent, message: str, session_id: Optional[str]) -> AsyncIterator[bytes]:
+    """Stream a chat answer as token events followed by a done or error event."""
+    try:
+        async for text in chat_agent.astream_chat(message, session_id=session_id):
+            yield _sse("token", {"text": text})
+    except Exception as e:
+        logger.error(f"Error in streaming chat: {e}")
+        yield _sse("error", {"error": str(e), "session_id": session_id})
+        return
+    yield _sse("done", {"session_id": session_id})
+
+
 @app.post("/chat/clear")
-async def clear_chat():
+async def clear_chat(chat_agent: ChatAgent = Depends(get_chat_agent)):
     """Clear chat conversation memory."""
     try:
         chat_agent.clear_memory()
@@ -1053,7 +1427,7 @@ if __name__ == "__main__":
     
     host = config.get('fastapi.host', '0.0.0.0')
     port = config.get('fastapi.port', 8000)
-    reload = config.get('fastapi.reload', True)
+    reload = config.get('fastapi.reload', False)
     
     uvicorn.run("src.api.main:app", host=host, port=port, reload=reload)
 
@@ -10,6 +10,12 @@ class InputType(str, Enum):
     AUDIO = "audio"
 
 
+class SearchResultFormat(str, Enum):
+    """Layout of search results in the response."""
+    ROWS = "rows"
+    COLUMNS = "columns"
+
+
 class Priority(str, Enum):
     """Priority level enumeration."""
     HIGH = "High"
@@ -95,12 +101,18 @@ class AnalysisResponse(BaseModel):
     analysis: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
     source_type: str
+    cached: bool = Field(False, description="Whether the analysis was reused from an identical or near-duplicate transcript")
 
 
 class SearchRequest(BaseModel):
     """Request model for searching similar transcripts."""
     query: str = Field(..., description="Search query text")
     top_k: int = Field(5, description="Number of results to return", ge=1, le=20)
+    source_type: Optional[InputType] = Field(None, description="Only return transcripts from this source")
+    format: SearchResultFormat = Field(
+        SearchResultFormat.ROWS,
+        description="rows: one object per result; columns: one list per field (field names sent once)"
+    )
 
 
 class SearchResult(BaseModel):
@@ -118,6 +130,9 @@ class SearchResponse(BaseModel):
     success: bool
     results: List[SearchResult]
     count: int
+    columns: Optional[Dict[str, List[Any]]] = Field(
+        None, description="Results as one list per SearchResult field (format=columns only)"
+    )
     error: Optional[str] = None
 
 
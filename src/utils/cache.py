@@ -0,0 +1,85 @@
+"""In-process caching utilities."""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache with optional time-to-live."""
+
+    def __init__(self, max_size: int = 256, ttl: Optional[float] = None):
+        """Initialize the cache.
+
+        Args:
+            max_size: Maximum number of entries to keep
+            ttl: Seconds an entry stays valid (None keeps entries until evicted)
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get a cached value.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value or None if missing or expired
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entry if full.
+
+        Args:
+            key: Cache key
+            value: Value to store (None is not cached)
+        """
+        if value is None or self.max_size <= 0:
+            return
+
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def hash_key(*parts: Any) -> str:
+    """Build a stable cache key from the given parts.
+
+    Args:
+        parts: Values that identify the cached item (converted with str())
+
+    Returns:
+        SHA-256 hex digest of the joined parts
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode('utf-8'))
+        digest.update(b'\x1f')
+    return digest.hexdigest()
@@ -1,14 +1,71 @@
 """Configuration loader utility."""
 import os
+from functools import lru_cache
+from types import MappingProxyType
 import yaml
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Mapping
 from dotenv import load_dotenv
 
+try:
+    # libyaml's C parser; PyYAML wheels built without libyaml lack it
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+
+@lru_cache(maxsize=None)
+def _read_yaml(path: str, mtime_ns: int) -> Any:
+    """Parse a YAML file once per modification time.
+
+    Args:
+        path: Path to the YAML file
+        mtime_ns: Modification time of the file; a new value forces a re-parse
+
+    Returns:
+        Parsed YAML content (shared; callers must not mutate it)
+    """
+    with open(path, 'rb') as f:
+        return yaml.load(f, Loader=SafeLoader)
+
+
+def _load_yaml(path: Path) -> Any:
+    """Load a YAML file, reusing the parse while the file is unchanged.
+
+    Args:
+        path: Path to the YAML file
+
+    Returns:
+        Parsed YAML content (shared; callers must not mutate it)
+    """
+    return _read_yaml(str(path), path.stat().st_mtime_ns)
+
+
+# .env files already applied to os.environ in this process
+_loaded_env_files = set()
+
 
 class ConfigLoader:
     """Load and manage configuration from YAML files and environment variables."""
     
+    # (environment variable, config section, key, type conversion); unset or
+    # empty variables leave the YAML value in place
+    _ENV_OVERRIDES = (
+        # Azure OpenAI
+        ("AZURE_OPENAI_ENDPOINT", "azure_openai", "endpoint", str),
+        ("AZURE_OPENAI_API_KEY", "azure_openai", "api_key", str),
+        ("AZURE_OPENAI_API_VERSION", "azure_openai", "api_version", str),
+        ("AZURE_OPENAI_DEPLOYMENT_NAME", "azure_openai", "deployment_name", str),
+        ("AZURE_OPENAI_EMBEDDING_DEPLOYMENT", "embeddings", "deployment_name", str),
+        # Milvus
+        ("MILVUS_HOST", "milvus", "host", str),
+        ("MILVUS_PORT", "milvus", "port", int),
+        ("MILVUS_USER", "milvus", "user", str),
+        ("MILVUS_PASSWORD", "milvus", "password", str),
+        ("MILVUS_SECURE", "milvus", "secure", lambda value: value.lower() == 'true'),
+        ("MILVUS_COLLECTION_NAME", "milvus", "collection_name", str),
+    )
+
     def __init__(self, config_dir: str = "config"):
         """Initialize the configuration loader.
         
@@ -19,22 +76,27 @@ class ConfigLoader:
         self.config: Dict[str, Any] = {}
         self.prompts: Dict[str, Any] = {}
         
-        # Load environment variables
+        # Load environment variables (once per .env file per process)
         env_file = self.config_dir / ".env"
-        if env_file.exists():
+        env_key = str(env_file.resolve())
+        if env_key not in _loaded_env_files and env_file.exists():
             load_dotenv(env_file)
+            _loaded_env_files.add(env_key)
         
         # Load configuration files
         self._load_config()
         self._load_prompts()
         self._override_with_env()
+        self._flat = self._flatten(self.config)
+        # Read-only view for get_all(); the flat index would go stale if the
+        # config were mutated after loading
+        self._frozen = self._freeze(self.config)
     
     def _load_config(self):
         """Load main configuration from YAML file."""
         config_file = self.config_dir / "config.yaml"
         if config_file.exists():
-            with open(config_file, 'r') as f:
-                self.config = yaml.safe_load(f)
+            self.config = _load_yaml(config_file)
         else:
             raise FileNotFoundError(f"Configuration file not found: {config_file}")
     
@@ -42,38 +104,27 @@ class ConfigLoader:
         """Load prompts configuration from YAML file."""
         prompts_file = self.config_dir / "prompts.yaml"
         if prompts_file.exists():
-            with open(prompts_file, 'r') as f:
-                self.prompts = yaml.safe_load(f)
+            self.prompts = _load_yaml(prompts_file)
         else:
             raise FileNotFoundError(f"Prompts file not found: {prompts_file}")
     
     def _override_with_env(self):
-        """Override configuration with environment variables."""
-        # Azure OpenAI
-        if os.getenv("AZURE_OPENAI_ENDPOINT"):
-            self.config['azure_openai']['endpoint'] = os.getenv("AZURE_OPENAI_ENDPOINT")
-        if os.getenv("AZURE_OPENAI_API_KEY"):
-            self.config['azure_openai']['api_key'] = os.getenv("AZURE_OPENAI_API_KEY")
-        if os.getenv("AZURE_OPENAI_API_VERSION"):
-            self.config['azure_openai']['api_version'] = os.getenv("AZURE_OPENAI_API_VERSION")
-        if os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME"):
-            self.config['azure_openai']['deployment_name'] = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME")
-        if os.getenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT"):
-            self.config['embeddings']['deployment_name'] = os.getenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT")
+        """Override configuration with environment variables.
 
-        # Milvus
-        if os.getenv("MILVUS_HOST"):
-            self.config['milvus']['host'] = os.getenv("MILVUS_HOST")
-        if os.getenv("MILVUS_PORT"):
-            self.config['milvus']['port'] = int(os.getenv("MILVUS_PORT"))
-        if os.getenv("MILVUS_USER"):
-            self.config['milvus']['user'] = os.getenv("MILVUS_USER")
-        if os.getenv("MILVUS_PASSWORD"):
-            self.config['milvus']['password'] = os.getenv("MILVUS_PASSWORD")
-        if os.getenv("MILVUS_SECURE"):
-            self.config['milvus']['secure'] = os.getenv("MILVUS_SECURE").lower() == 'true'
-        if os.getenv("MILVUS_COLLECTION_NAME"):
-            self.config['milvus']['collection_name'] = os.getenv("MILVUS_COLLECTION_NAME")
+        The loaded YAML is shared with the parse cache, so only the top level
+        and the sections that are actually overridden are copied.
+        """
+        environ = os.environ
+        copied_sections = set()
+        for env_name, section, key, cast in self._ENV_OVERRIDES:
+            value = environ.get(env_name)
+            if value:
+                if not copied_sections:
+                    self.config = dict(self.config)
+                if section not in copied_sections:
+                    self.config[section] = dict(self.config[section])
+                    copied_sections.add(section)
+                self.config[section][key] = cast(value)
     
     def get(self, key: str, default: Any = None) -> Any:
         """Get configuration value by key.
@@ -85,18 +136,43 @@ class ConfigLoader:
         Returns:
             Configuration value
         """
-        keys = key.split('.')
-        value = self.config
-        
-        for k in keys:
-            if isinstance(value, dict):
-                value = value.get(k)
-                if value is None:
-                    return default
-            else:
-                return default
-        
+        value = self._flat.get(key)
+        return default if value is None else value
+
+    @staticmethod
+    def _freeze(value: Any) -> Any:
+        """Make a read-only copy of a configuration value.
+
+        Dicts become MappingProxyType views and lists become tuples, at every
+        level of nesting.
+        """
+        if isinstance(value, dict):
+            return MappingProxyType({key: ConfigLoader._freeze(item) for key, item in value.items()})
+        if isinstance(value, list):
+            return tuple(ConfigLoader._freeze(item) for item in value)
         return value
+
+    @staticmethod
+    def _flatten(config: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+        """Index every value in the configuration by its dotted key.
+
+        Nested sections are indexed too, so get('milvus') still returns the
+        whole section.
+
+        Args:
+            config: Configuration dictionary (or section)
+            prefix: Dotted key of the section being flattened
+
+        Returns:
+            Mapping of dotted key to value
+        """
+        flat = {}
+        for key, value in config.items():
+            dotted = f"{prefix}{key}"
+            flat[dotted] = value
+            if isinstance(value, dict):
+                flat.update(ConfigLoader._flatten(value, f"{dotted}."))
+        return flat
     
     def get_prompt(self, prompt_name: str) -> str:
         """Get prompt template by name.
@@ -109,13 +185,14 @@ class ConfigLoader:
         """
         return self.prompts.get(prompt_name, "")
     
-    def get_all(self) -> Dict[str, Any]:
+    def get_all(self) -> Mapping[str, Any]:
         """Get all configuration.
         
         Returns:
-            Complete configuration dictionary
+            Read-only copy of the complete configuration (nested sections
+            are read-only too)
         """
-        return self.config
+        return self._frozen
 
 
 # Global configuration instance
@@ -3,73 +3,168 @@ Document processor for extracting text from various file formats.
 Supports: PDF, Word (DOCX), CSV, Excel (XLSX), and plain text.
 """
 
+import csv
+import importlib
 import io
 import logging
-from typing import Optional
-from pathlib import Path
+import os
+from functools import lru_cache
+from types import ModuleType
+from typing import BinaryIO, List, Optional, Union
 
-try:
-    from PyPDF2 import PdfReader
-except ImportError:
-    PdfReader = None
+logger = logging.getLogger(__name__)
 
-try:
-    from docx import Document
-except ImportError:
-    Document = None
+# File content is either the raw bytes or a seekable binary file (such as an
+# upload spooled to disk), which the parsers read without a full in-memory copy
+FileContent = Union[bytes, BinaryIO]
 
-try:
-    import pandas as pd
-except ImportError:
-    pd = None
 
-logger = logging.getLogger(__name__)
+@lru_cache(maxsize=None)
+def _optional_import(module_name: str) -> Optional[ModuleType]:
+    """Import a parser library on first use.
+
+    The parsers (pandas in particular) are slow to import, and most
+    processes that import this module only ever see one or two formats.
+
+    Returns:
+        The module, or None if it is not installed
+    """
+    try:
+        return importlib.import_module(module_name)
+    except ImportError:
+        return None
+
+
+def file_suffix(filename: str) -> str:
+    """Get the lower-cased extension of a file name, including the dot."""
+    return os.path.splitext(filename)[1].lower()
+
+
+def _as_stream(file_content: FileContent) -> BinaryIO:
+    """Wrap raw bytes in a stream; file objects are passed through."""
+    if isinstance(file_content, (bytes, bytearray)):
+        return io.BytesIO(file_content)
+    return file_content
+
+
+def _frame_to_text(df: "pandas.DataFrame") -> str:
+    """Render a DataFrame as tab-separated rows with a header line.
+
+    Uses pandas' C CSV writer; to_string pads every cell to its column
+    width in Python, which is slow for large sheets.
+    """
+    buffer = io.StringIO()
+    df.to_csv(buffer, sep='\t', index=False, lineterminator='\n')
+    return buffer.getvalue()
+
+
+def _read_csv_header(csv_file: BinaryIO) -> List[str]:
+    """Read the header row of a CSV stream, then rewind the stream to it."""
+    start = csv_file.tell()
+    text_file = io.TextIOWrapper(csv_file, encoding='utf-8-sig', newline='')
+    try:
+        header = next(csv.reader(text_file), None)
+    finally:
+        text_file.detach()
+        csv_file.seek(start)
+    if header is None:
+        raise ValueError("CSV file is empty")
+    return header
 
 
 class DocumentProcessor:
     """Process various document formats and extract text."""
     
     @staticmethod
-    def extract_text_from_pdf(file_content: bytes) -> str:
+    def extract_text_from_pdf(file_content: FileContent) -> str:
         """Extract text from PDF file."""
-        if PdfReader is None:
-            raise ImportError("PyPDF2 is required for PDF processing. Install with: pip install pypdf2")
+        return DocumentProcessor.extract_text_from_pdf_pages(file_content)
+    
+    @staticmethod
+    def extract_text_from_pdf_pages(file_content: FileContent, start: int = 0, stop: Optional[int] = None) -> str:
+        """Extract text from a range of PDF pages.
+        
+        Texts of consecutive page ranges joined with a blank line give the
+        same result as extracting the whole document, so ranges can be
+        extracted in separate processes.
+        
+        Args:
+            file_content: Binary content of the PDF, or a seekable binary file
+            start: Index of the first page to extract
+            stop: Index after the last page to extract (default: last page)
+            
+        Returns:
+            Extracted text of the pages in the range
+        """
+        pypdf = _optional_import("pypdf")
+        if pypdf is None:
+            raise ImportError("pypdf is required for PDF processing. Install with: pip install pypdf")
         
         try:
-            pdf_file = io.BytesIO(file_content)
-            pdf_reader = PdfReader(pdf_file)
+            pdf_file = _as_stream(file_content)
+            pdf_reader = pypdf.PdfReader(pdf_file)
+            pages = pdf_reader.pages[start:stop]
             
-            text_parts = []
-            for page_num, page in enumerate(pdf_reader.pages, 1):
+            # Pages are written straight into one buffer rather than kept as a list
+            buffer = io.StringIO()
+            for page_num, page in enumerate(pages, start + 1):
                 text = page.extract_text()
-                if text.strip():
-                    text_parts.append(f"--- Page {page_num} ---\n{text}")
+                if text and not text.isspace():
+                    if buffer.tell():
+                        buffer.write("\n\n")
+                    buffer.write(f"--- Page {page_num} ---\n")
+                    buffer.write(text)
             
-            return "\n\n".join(text_parts)
+            return buffer.getvalue()
         except Exception as e:
             logger.error(f"Error extracting text from PDF: {e}")
             raise ValueError(f"Failed to process PDF: {str(e)}")
     
     @staticmethod
-    def extract_text_from_docx(file_content: bytes) -> str:
-        """Extract text from Word DOCX file."""
-        if Document is None:
+    def count_pdf_pages(file_content: FileContent) -> int:
+        """Count the pages of a PDF without extracting any text."""
+        pypdf = _optional_import("pypdf")
+        if pypdf is None:
+            raise ImportError("pypdf is required for PDF processing. Install with: pip install pypdf")
+        
+        try:
+            return len(pypdf.PdfReader(_as_stream(file_content)).pages)
+        except Exception as e:
+            logger.error(f"Error reading PDF: {e}")
+            raise ValueError(f"Failed to process PDF: {str(e)}")
+    
+    @staticmethod
+    def extract_text_from_docx(file_content: FileContent) -> str:
+        """Extract text from Word DOCX file.
+        
+        Body paragraphs come first, then one line per table row with the
+        cells separated by " | ". Paragraph text is read from the body's
+        <w:p> elements with python-docx's own oxml rendering (the same text
+        Paragraph.text gives), without creating a Paragraph proxy for each
+        one. Table rows go through row.cells, so merged cells repeat per
+        grid column as before.
+        """
+        docx = _optional_import("docx")
+        if docx is None:
             raise ImportError("python-docx is required for Word processing. Install with: pip install python-docx")
         
         try:
-            docx_file = io.BytesIO(file_content)
-            doc = Document(docx_file)
+            docx_file = _as_stream(file_content)
+            doc = docx.Document(docx_file)
             
             text_parts = []
-            for para in doc.paragraphs:
-                if para.text.strip():
-                    text_parts.append(para.text)
+            for para in doc.element.body.xpath("./w:p"):
+                text = para.text
+                if text and not text.isspace():
+                    text_parts.append(text)
             
             # Also extract text from tables
             for table in doc.tables:
                 for row in table.rows:
-                    row_text = " | ".join(cell.text.strip() for cell in row.cells)
-                    if row_text.strip():
+                    # join() builds a list from a generator anyway; hand it lists directly
+                    cell_texts = [cell.text for cell in row.cells]
+                    row_text = " | ".join(map(str.strip, cell_texts))
+                    if row_text and not row_text.isspace():
                         text_parts.append(row_text)
             
             return "\n".join(text_parts)
@@ -78,22 +173,44 @@ class DocumentProcessor:
             raise ValueError(f"Failed to process Word document: {str(e)}")
     
     @staticmethod
-    def extract_text_from_csv(file_content: bytes) -> str:
-        """Extract text from CSV file."""
+    def extract_text_from_csv(file_content: FileContent) -> str:
+        """Extract text from CSV file.
+        
+        Parsed with pyarrow's multithreaded CSV reader when it is installed,
+        otherwise with pandas. Cells are read as strings, so both paths
+        render the same text and values appear as written in the file.
+        """
+        pacsv = _optional_import("pyarrow.csv")
+        pd = _optional_import("pandas")
         if pd is None:
             raise ImportError("pandas is required for CSV processing. Install with: pip install pandas")
         
         try:
-            csv_file = io.BytesIO(file_content)
-            df = pd.read_csv(csv_file)
+            csv_file = _as_stream(file_content)
+            if pacsv is not None:
+                # Column types are given by position, so the header is read first
+                header = _read_csv_header(csv_file)
+                table = pacsv.read_csv(
+                    csv_file,
+                    read_options=pacsv.ReadOptions(skip_rows=1, autogenerate_column_names=True),
+                    convert_options=pacsv.ConvertOptions(
+                        column_types={f"f{i}": "string" for i in range(len(header))},
+                        strings_can_be_null=False
+                    )
+                )
+                # write_csv quotes every string value; pandas' writer quotes only when needed
+                df = table.rename_columns(header).to_pandas()
+            else:
+                df = pd.read_csv(csv_file, dtype=str, keep_default_na=False)
+            num_rows, columns = len(df), list(map(str, df.columns))
+            data = _frame_to_text(df)
             
-            # Convert DataFrame to readable text format
-            text_parts = [f"CSV Data ({len(df)} rows, {len(df.columns)} columns)\n"]
-            text_parts.append("Columns: " + ", ".join(df.columns))
+            # Convert the table to readable text format
+            text_parts = [f"CSV Data ({num_rows} rows, {len(columns)} columns)\n"]
+            text_parts.append("Columns: " + ", ".join(columns))
             text_parts.append("\n--- Data ---")
             
-            # Convert to string representation
-            text_parts.append(df.to_string(index=False))
+            text_parts.append(data)
             
             return "\n".join(text_parts)
         except Exception as e:
@@ -101,13 +218,64 @@ class DocumentProcessor:
             raise ValueError(f"Failed to process CSV: {str(e)}")
     
     @staticmethod
-    def extract_text_from_excel(file_content: bytes) -> str:
-        """Extract text from Excel XLSX file."""
+    def extract_text_from_excel(file_content: FileContent) -> str:
+        """Extract text from Excel XLSX file (see extract_text_from_xls for .xls).
+        
+        Sheets are streamed row by row in openpyxl's read-only mode, so no
+        sheet is held in memory as a whole. The first row of each sheet is
+        taken as its header; empty rows are skipped.
+        """
+        openpyxl = _optional_import("openpyxl")
+        if openpyxl is None:
+            raise ImportError("openpyxl is required for Excel processing. Install with: pip install openpyxl")
+        
+        try:
+            excel_file = _as_stream(file_content)
+            workbook = openpyxl.load_workbook(excel_file, read_only=True, data_only=True)
+            
+            text_parts = []
+            try:
+                for sheet in workbook.worksheets:
+                    buffer = io.StringIO()
+                    writer = csv.writer(buffer, delimiter='\t', lineterminator='\n')
+                    columns = None
+                    num_rows = 0
+                    for row in sheet.iter_rows(values_only=True):
+                        if all(cell is None for cell in row):
+                            continue
+                        if columns is None:
+                            columns = ["" if cell is None else str(cell) for cell in row]
+                        else:
+                            num_rows += 1
+                        writer.writerow(row)
+                    columns = columns or []
+                    
+                    text_parts.append(f"\n=== Sheet: {sheet.title} ===")
+                    text_parts.append(f"({num_rows} rows, {len(columns)} columns)")
+                    text_parts.append("Columns: " + ", ".join(columns))
+                    text_parts.append("\n--- Data ---")
+                    text_parts.append(buffer.getvalue())
+            finally:
+                # Read-only workbooks keep the archive open until closed
+                workbook.close()
+            
+            return "\n".join(text_parts)
+        except Exception as e:
+            logger.error(f"Error extracting text from Excel: {e}")
+            raise ValueError(f"Failed to process Excel file: {str(e)}")
+    
+    @staticmethod
+    def extract_text_from_xls(file_content: FileContent) -> str:
+        """Extract text from a legacy Excel 97-2003 (.xls) workbook.
+        
+        openpyxl only reads .xlsx, so these are parsed with pandas (xlrd engine).
+        """
+        pd = _optional_import("pandas")
         if pd is None:
-            raise ImportError("pandas is required for Excel processing. Install with: pip install pandas openpyxl")
+            raise ImportError("pandas is required for .xls processing. Install with: pip install pandas xlrd")
         
         try:
-            excel_file = io.BytesIO(file_content)
+            excel_file = _as_stream(file_content)
             # Read all sheets
             excel_data = pd.read_excel(excel_file, sheet_name=None)
             
@@ -115,9 +283,9 @@ class DocumentProcessor:
             for sheet_name, df in excel_data.items():
                 text_parts.append(f"\n=== Sheet: {sheet_name} ===")
                 text_parts.append(f"({len(df)} rows, {len(df.columns)} columns)")
-                text_parts.append("Columns: " + ", ".join(df.columns))
+                text_parts.append("Columns: " + ", ".join(map(str, df.columns)))
                 text_parts.append("\n--- Data ---")
-                text_parts.append(df.to_string(index=False))
+                text_parts.append(_frame_to_text(df))
             
             return "\n".join(text_parts)
         except Exception as e:
@@ -125,29 +293,41 @@ class DocumentProcessor:
             raise ValueError(f"Failed to process Excel file: {str(e)}")
     
     @staticmethod
-    def process_file(filename: str, file_content: bytes) -> str:
+    def extract_text_from_txt(file_content: FileContent) -> str:
+        """Extract text from a UTF-8 plain text file."""
+        return _as_stream(file_content).read().decode('utf-8')
+    
+    # Extractor for each supported file extension
+    _HANDLERS = {
+        '.pdf': extract_text_from_pdf,
+        '.docx': extract_text_from_docx,
+        '.doc': extract_text_from_docx,
+        '.csv': extract_text_from_csv,
+        '.xlsx': extract_text_from_excel,
+        '.xls': extract_text_from_xls,
+        '.txt': extract_text_from_txt,
+    }
+    
+    @staticmethod
+    def process_file(filename: str, file_content: FileContent) -> str:
         """
         Process a file and extract text based on file extension.
         
         Args:
             filename: Name of the file
-            file_content: Binary content of the file
+            file_content: Binary content of the file, or a seekable binary file
             
         Returns:
             Extracted text content
         """
-        file_ext = Path(filename).suffix.lower()
+        file_ext = file_suffix(filename)
         
-        if file_ext == '.pdf':
-            return DocumentProcessor.extract_text_from_pdf(file_content)
-        elif file_ext in ['.docx', '.doc']:
-            return DocumentProcessor.extract_text_from_docx(file_content)
-        elif file_ext == '.csv':
-            return DocumentProcessor.extract_text_from_csv(file_content)
-        elif file_ext in ['.xlsx', '.xls']:
-            return DocumentProcessor.extract_text_from_excel(file_content)
-        elif file_ext == '.txt':
-            return file_content.decode('utf-8')
-        else:
+        handler = DocumentProcessor._HANDLERS.get(file_ext)
+        if handler is None:
             raise ValueError(f"Unsupported file format: {file_ext}. Supported formats: PDF, DOCX, CSV, XLSX, TXT")
+        return handler(file_content)
+
+
+# File extensions process_file can extract text from
+SUPPORTED_SUFFIXES = frozenset(DocumentProcessor._HANDLERS)
 
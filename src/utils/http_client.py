@@ -0,0 +1,100 @@
+"""Shared HTTP clients for Azure OpenAI traffic."""
+import threading
+from typing import Any, Optional
+
+import httpx
+import orjson
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+# Connection pool limits shared by the sync and async clients
+POOL_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=50,
+    keepalive_expiry=60.0
+)
+# Matches the OpenAI SDK default; long Whisper jobs need the generous read timeout
+REQUEST_TIMEOUT = httpx.Timeout(600.0, connect=10.0)
+
+
+class _OrjsonBodyMixin:
+    """Serialize json= request bodies with orjson instead of the stdlib encoder.
+
+    The OpenAI SDK (and LiteLLM through it) passes request payloads as json=,
+    which httpx encodes with json.dumps; for long transcripts that is the
+    largest client-side CPU cost of a call. Payloads orjson cannot encode
+    fall back to httpx's own encoding.
+    """
+
+    def build_request(self, method: str, url: Any, *, json: Any = None, content: Any = None,
+                      headers: Any = None, **kwargs: Any) -> httpx.Request:
+        if json is not None and content is None:
+            try:
+                content = orjson.dumps(json)
+            except TypeError:
+                pass
+            else:
+                json = None
+                headers = httpx.Headers(headers)
+                headers.setdefault("Content-Type", "application/json")
+        return super().build_request(method, url, json=json, content=content, headers=headers, **kwargs)
+
+
+class OrjsonClient(_OrjsonBodyMixin, httpx.Client):
+    """httpx.Client with orjson request body serialization."""
+
+
+class OrjsonAsyncClient(_OrjsonBodyMixin, httpx.AsyncClient):
+    """httpx.AsyncClient with orjson request body serialization."""
+
+
+_http_client: Optional[httpx.Client] = None
+_async_http_client: Optional[httpx.AsyncClient] = None
+_lock = threading.Lock()
+
+
+def get_http_client() -> httpx.Client:
+    """Get the process-wide sync HTTP client.
+
+    Returns:
+        httpx.Client with keep-alive pooling (HTTP/2 when h2 is installed)
+    """
+    global _http_client
+    with _lock:
+        if _http_client is None:
+            _http_client = OrjsonClient(
+                http2=HTTP2_AVAILABLE,
+                limits=POOL_LIMITS,
+                timeout=REQUEST_TIMEOUT
+            )
+        return _http_client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Get the process-wide async HTTP client.
+
+    Returns:
+        httpx.AsyncClient with keep-alive pooling (HTTP/2 when h2 is installed)
+    """
+    global _async_http_client
+    with _lock:
+        if _async_http_client is None:
+            _async_http_client = OrjsonAsyncClient(
+                http2=HTTP2_AVAILABLE,
+                limits=POOL_LIMITS,
+                timeout=REQUEST_TIMEOUT
+            )
+        return _async_http_client
+
+
+def configure_litellm_clients():
+    """Route LiteLLM's OpenAI/Azure calls through the shared HTTP clients."""
+    import litellm
+
+    litellm.client_session = get_http_client()
+    litellm.aclient_session = get_async_http_client()
@@ -1,42 +1,102 @@
 """Text Chunking Utilities using LangChain Text Splitters."""
-from typing import List, Dict, Any
+import threading
+from functools import lru_cache
+from typing import List, Dict, Any, Optional
 from langchain_text_splitters import (
     RecursiveCharacterTextSplitter,
     CharacterTextSplitter,
     TokenTextSplitter
 )
+from src.utils.cache import LRUCache, hash_key
+from src.utils.config_loader import get_config
 from src.utils.logger import setup_logger
 
+try:
+    # Optional Rust splitter (PyO3), enabled with chunking.rust_splitter
+    from semantic_text_splitter import TextSplitter
+except ImportError:
+    TextSplitter = None
+
+
+# Recursive Character Text Splitter (Best for most use cases)
+_RECURSIVE_SPLITTER = RecursiveCharacterTextSplitter(
+    chunk_size=2000,
+    chunk_overlap=200,
+    length_function=len,
+    separators=["\n\n", "\n", ". ", " ", ""]
+)
+
+# Character Text Splitter (Simple splitting)
+_CHARACTER_SPLITTER = CharacterTextSplitter(
+    chunk_size=2000,
+    chunk_overlap=200,
+    separator="\n"
+)
+
+
+# Recursive splits kept for texts that are chunked again (retries, re-ingests)
+CHUNK_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=None)
+def _get_rust_splitter() -> "TextSplitter":
+    """Build the Rust counterpart of the recursive splitter (2000 chars, 200 overlap)."""
+    return TextSplitter(2000, overlap=200)
+
+
+@lru_cache(maxsize=None)
+def _get_token_splitter() -> TokenTextSplitter:
+    """Build the token splitter on first use.
+
+    Constructing it loads the tiktoken BPE tables, which only token
+    chunking needs.
+    """
+    return TokenTextSplitter(
+        chunk_size=1500,  # Safe limit for embeddings (8192 token limit)
+        chunk_overlap=150
+    )
+
+
+@lru_cache(maxsize=None)
+def _get_rust_token_splitter() -> "TextSplitter":
+    """Build the Rust counterpart of the token splitter (1500 tokens, 150 overlap).
+
+    Counts cl100k_base tokens, the encoding of the embedding models, where
+    LangChain's TokenTextSplitter counts gpt2 tokens.
+    """
+    return TextSplitter.from_tiktoken_model("gpt-3.5-turbo", 1500, overlap=150)
+
 
 class TextChunker:
     """Handle text chunking for large documents using LangChain."""
     
-    def __init__(self):
-        """Initialize the text chunker."""
+    def __init__(self, use_rust_splitter: Optional[bool] = None):
+        """Initialize the text chunker.
+
+        Args:
+            use_rust_splitter: Split with semantic-text-splitter instead of
+                LangChain (faster, but picks different chunk boundaries);
+                None keeps LangChain
+        """
         self.logger = setup_logger(__name__)
         
-        # Recursive Character Text Splitter (Best for most use cases)
-        self.recursive_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=2000,
-            chunk_overlap=200,
-            length_function=len,
-            separators=["\n\n", "\n", ". ", " ", ""]
-        )
-        
-        # Character Text Splitter (Simple splitting)
-        self.character_splitter = CharacterTextSplitter(
-            chunk_size=2000,
-            chunk_overlap=200,
-            separator="\n"
-        )
-        
-        # Token Text Splitter (For token-based limits)
-        self.token_splitter = TokenTextSplitter(
-            chunk_size=1500,  # Safe limit for embeddings (8192 token limit)
-            chunk_overlap=150
-        )
+        # Splitters are shared module-level objects
+        self.recursive_splitter = _RECURSIVE_SPLITTER
+        self.character_splitter = _CHARACTER_SPLITTER
+        
+        # Recursive chunks keyed by a hash of the text
+        self.chunk_cache = LRUCache(max_size=CHUNK_CACHE_SIZE)
+        
+        if use_rust_splitter and TextSplitter is None:
+            self.logger.warning("Rust splitter requested but semantic-text-splitter is not installed")
+        self.use_rust_splitter = bool(use_rust_splitter) and TextSplitter is not None
         
         self.logger.info("Text chunker initialized with LangChain splitters")
+
+    @property
+    def token_splitter(self) -> TokenTextSplitter:
+        """Token Text Splitter (For token-based limits), built on first use."""
+        return _get_token_splitter()
     
     def chunk_text_recursive(self, text: str) -> List[str]:
         """Split text using recursive character splitter (recommended).
@@ -51,13 +111,47 @@ class TextChunker:
             List of text chunks
         """
         try:
-            chunks = self.recursive_splitter.split_text(text)
+            chunks = self._split_recursive_cached(text)
             self.logger.info(f"Split text into {len(chunks)} chunks using recursive splitter")
             return chunks
         except Exception as e:
             self.logger.error(f"Error in recursive chunking: {e}")
             return [text]
     
+    def chunk_many(self, texts: List[str]) -> List[List[str]]:
+        """Split several texts using the recursive character splitter.
+        
+        Args:
+            texts: Texts to split
+            
+        Returns:
+            List of text chunks for each text, in the same order
+        """
+        results = []
+        for text in texts:
+            try:
+                results.append(self._split_recursive_cached(text))
+            except Exception as e:
+                self.logger.error(f"Error in recursive chunking: {e}")
+                results.append([text])
+        
+        if texts:
+            self.logger.info(f"Split {len(texts)} texts into {sum(map(len, results))} chunks using recursive splitter")
+        return results
+    
+    def _split_recursive_cached(self, text: str) -> List[str]:
+        """Split text with the recursive splitter, reusing the chunks of a recent identical text."""
+        cache_key = hash_key(text)
+        chunks = self.chunk_cache.get(cache_key)
+        if chunks is None:
+            if self.use_rust_splitter:
+                chunks = tuple(_get_rust_splitter().chunks(text))
+            else:
+                chunks = tuple(self.recursive_splitter.split_text(text))
+            self.chunk_cache.set(cache_key, chunks)
+        # Callers get their own list; the cached chunks stay immutable
+        return list(chunks)
+    
     def chunk_text_by_character(self, text: str) -> List[str]:
         """Split text using character splitter.
         
@@ -89,25 +183,36 @@ class TextChunker:
             List of text chunks
         """
         try:
-            chunks = self.token_splitter.split_text(text)
+            if self.use_rust_splitter:
+                chunks = _get_rust_token_splitter().chunks(text)
+            else:
+                chunks = self.token_splitter.split_text(text)
             self.logger.info(f"Split text into {len(chunks)} chunks using token splitter")
             return chunks
         except Exception as e:
             self.logger.error(f"Error in token chunking: {e}")
             return [text]
     
-    def chunk_documents(self, text: str, metadata: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+    def chunk_documents(
+        self,
+        text: str,
+        metadata: Dict[str, Any] = None,
+        chunks: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
         """Chunk text and return with metadata.
         
         Args:
             text: Text to chunk
             metadata: Optional metadata to attach to each chunk
+            chunks: Recursive chunks of text already computed by the caller
+                (skips splitting the text again)
             
         Returns:
             List of dictionaries with 'text' and 'metadata' keys
         """
         try:
-            chunks = self.chunk_text_recursive(text)
+            if chunks is None:
+                chunks = self.chunk_text_recursive(text)
             
             result = []
             for idx, chunk in enumerate(chunks):
@@ -148,13 +253,45 @@ class TextChunker:
                 'max_chunk_size': 0
             }
         
-        chunk_sizes = [len(chunk) for chunk in chunks]
+        # One pass over the chunks, with no intermediate list of sizes
+        total = 0
+        min_size = max_size = len(chunks[0])
+        for chunk in chunks:
+            size = len(chunk)
+            total += size
+            if size < min_size:
+                min_size = size
+            elif size > max_size:
+                max_size = size
         
         return {
             'total_chunks': len(chunks),
-            'total_characters': sum(chunk_sizes),
-            'avg_chunk_size': sum(chunk_sizes) // len(chunks),
-            'min_chunk_size': min(chunk_sizes),
-            'max_chunk_size': max(chunk_sizes)
+            'total_characters': total,
+            'avg_chunk_size': total // len(chunks),
+            'min_chunk_size': min_size,
+            'max_chunk_size': max_size
         }
 
+
+# Global chunker instance
+_chunker_instance = None
+_chunker_lock = threading.Lock()
+
+
+def get_text_chunker() -> TextChunker:
+    """Get global text chunker instance.
+
+    The splitters hold no per-call state, so one instance is shared by all
+    callers.
+
+    Returns:
+        TextChunker instance
+    """
+    global _chunker_instance
+    if _chunker_instance is None:
+        with _chunker_lock:
+            if _chunker_instance is None:
+                _chunker_instance = TextChunker(
+                    use_rust_splitter=get_config().get('chunking.rust_splitter', False)
+                )
+    return _chunker_instance